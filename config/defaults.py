@@ -60,6 +60,15 @@ WORKING_DAYS_PER_WEEK = 5
 # RTO utilization alert threshold
 RTO_UTILIZATION_THRESHOLD = 0.20
 
+# LP/MILP backend for the optimizer: "cbc" or "highs" ("highs" falls back to "cbc" if highspy is missing)
+DEFAULT_LP_SOLVER = "cbc"
+
+# Max rows per dashboard alert table (full list is offered as a CSV download)
+MAX_ALERTS_SHOWN = 200
+
+# Rows per page in the Unit Impact table (the CSV export always has every row)
+UNIT_IMPACT_PAGE_SIZE = 200
+
 # Planning buffer presets (replaces individual buffer/scaling sliders for Advanced mode)
 PLANNING_BUFFER_PRESETS = {
     "lean": {
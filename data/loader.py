@@ -1,5 +1,7 @@
 """File upload parsing — CSV/XLSX into typed model lists."""
 
+import sys
+
 import pandas as pd
 from typing import List, Tuple
 from models.building import Floor
@@ -22,14 +24,18 @@ def parse_buildings(df: pd.DataFrame) -> List[Floor]:
 
 
 def parse_units(df: pd.DataFrame) -> List[Unit]:
-    """Convert a units DataFrame into Unit objects."""
+    """Convert a units DataFrame into Unit objects.
+
+    Unit names are interned so the units, attendance and allocation lists
+    share one string object per unit, which keeps name-keyed lookups cheap.
+    """
     units = []
     for _, row in df.iterrows():
         priority = None
         if "Business Priority" in df.columns and pd.notna(row.get("Business Priority")):
             priority = str(row["Business Priority"]).strip()
         units.append(Unit(
-            unit_name=str(row["Unit Name"]).strip(),
+            unit_name=sys.intern(str(row["Unit Name"]).strip()),
             current_total_hc=int(row["Current Total Headcount"]),
             hc_growth_pct=float(row["HC Growth Forecast (%)"]) / 100.0,
             attrition_pct=float(row["Attrition Forecast (%)"]) / 100.0,
@@ -43,7 +49,7 @@ def parse_attendance(df: pd.DataFrame) -> List[AttendanceProfile]:
     profiles = []
     for _, row in df.iterrows():
         profiles.append(AttendanceProfile(
-            unit_name=str(row["Unit Name"]).strip(),
+            unit_name=sys.intern(str(row["Unit Name"]).strip()),
             monthly_median_hc=float(row["Monthly Median In-Office Strength"]),
             monthly_max_hc=float(row["Monthly Max In-Office Strength"]),
             avg_rto_days_per_week=float(row["Avg RTO Days/Week"]),
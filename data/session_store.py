@@ -1,5 +1,6 @@
 """Typed wrapper around st.session_state for application data."""
 
+import uuid
 import streamlit as st
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -9,6 +10,9 @@ from models.attendance import AttendanceProfile
 from models.scenario import Scenario, ScenarioParams
 from models.allocation import AllocationRecommendation, FloorAssignment
 from models.audit import AuditEntry
+from engine.scenario_engine import apply_overrides
+from engine.allocation_engine import compute_rto_alerts
+from engine.spatial import get_floor_utilization
 
 
 def initialize_session_state():
@@ -22,6 +26,8 @@ def initialize_session_state():
         "audit_log": [],
         "data_loaded": False,
         "last_data_edit_at": None,
+        "session_token": uuid.uuid4().hex,
+        "data_version": 0,
         "rule_config": {
             "allocation_mode": "simple",
             "global_alloc_pct": 0.80,
@@ -56,6 +62,73 @@ def get_attendance() -> List[AttendanceProfile]:
     return st.session_state.get("attendance", [])
 
 
+def _memoized(name: str, build):
+    """Return a value derived from session data, rebuilt only when the data version changes."""
+    version = st.session_state.get("data_version", 0)
+    key = f"_memo_{name}"
+    cached = st.session_state.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, build())
+        st.session_state[key] = cached
+    return cached[1]
+
+
+def get_attendance_index() -> Dict[str, AttendanceProfile]:
+    """unit_name -> AttendanceProfile lookup. Treat as read-only."""
+    return _memoized("attendance_index", lambda: {a.unit_name: a for a in get_attendance()})
+
+
+def get_unit_index() -> Dict[str, Unit]:
+    """unit_name -> Unit lookup. Treat as read-only."""
+    return _memoized("unit_index", lambda: {u.unit_name: u for u in get_units()})
+
+
+def get_total_seats() -> int:
+    """Total seats across all base floors."""
+    return _memoized("total_seats", lambda: sum(f.total_seats for f in get_floors()))
+
+
+def get_floor_ids() -> List[str]:
+    """Sorted unique floor ids across all base floors. Treat as read-only."""
+    return _memoized("floor_ids", lambda: sorted({f.floor_id for f in get_floors()}))
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _scenario_rto(data_version, scenario_id, last_run_at, rule_config,
+                  _units, _att_map, _scenario) -> tuple:
+    _, scenario_att_map = apply_overrides(_units, _att_map, _scenario)
+    rto_alerts = compute_rto_alerts(_scenario.allocation_results, _units, scenario_att_map, rule_config)
+    return scenario_att_map, rto_alerts, {ra["unit_name"]: ra for ra in rto_alerts}
+
+
+def get_scenario_rto(scenario: Scenario) -> tuple:
+    """(scenario attendance map, RTO alerts, unit_name -> alert) for a scenario run.
+
+    The attendance map has the scenario's unit overrides and RTO mandate applied.
+    Cached per data version, scenario run and rule config. Treat as read-only.
+    """
+    return _scenario_rto(
+        get_data_version(), scenario.scenario_id, scenario.last_run_at, get_rule_config(),
+        get_units(), get_attendance_index(), scenario,
+    )
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _scenario_floor_util(data_version, scenario_id, last_run_at, _floors, _assignments) -> list:
+    return get_floor_utilization(_floors, _assignments)
+
+
+def get_scenario_floor_util(scenario: Scenario) -> list:
+    """Per-floor utilization rows for a scenario run, over the unmodified base floors.
+
+    Cached per data version and scenario run. Treat as read-only.
+    """
+    return _scenario_floor_util(
+        get_data_version(), scenario.scenario_id, scenario.last_run_at,
+        get_floors(), scenario.floor_assignments,
+    )
+
+
 def get_scenarios() -> Dict[str, Scenario]:
     return st.session_state.get("scenarios", {})
 
@@ -87,20 +160,39 @@ def get_last_data_edit():
 
 def set_last_data_edit():
     st.session_state["last_data_edit_at"] = datetime.now()
+    for scenario in get_scenarios().values():
+        scenario.is_stale = True
+
+
+def get_data_version() -> tuple:
+    """Cache key identifying the current base data and scenarios of this session.
+
+    Changes whenever floors, units, attendance or a scenario are stored, and
+    carries a per-session token so ``st.cache_data`` entries are never shared
+    between browser sessions.
+    """
+    return (st.session_state.get("session_token"), st.session_state.get("data_version", 0))
+
+
+def _bump_data_version():
+    st.session_state["data_version"] = st.session_state.get("data_version", 0) + 1
 
 
 # --- Setters ---
 
 def set_floors(floors: List[Floor]):
     st.session_state["floors"] = floors
+    _bump_data_version()
 
 
 def set_units(units: List[Unit]):
     st.session_state["units"] = units
+    _bump_data_version()
 
 
 def set_attendance(attendance: List[AttendanceProfile]):
     st.session_state["attendance"] = attendance
+    _bump_data_version()
 
 
 def set_data_loaded(loaded: bool):
@@ -119,17 +211,24 @@ def set_rule_config(config: dict):
 # --- Scenario Management ---
 
 def add_scenario(scenario: Scenario):
+    # Scenarios added after a data edit are stale until they are (re-)run
+    last_edit = get_last_data_edit()
+    if last_edit and (scenario.last_run_at is None or last_edit > scenario.last_run_at):
+        scenario.is_stale = True
     st.session_state["scenarios"][scenario.scenario_id] = scenario
+    _bump_data_version()
 
 
 def remove_scenario(scenario_id: str):
     st.session_state["scenarios"].pop(scenario_id, None)
+    _bump_data_version()
     if get_active_scenario_id() == scenario_id:
         set_active_scenario_id("baseline")
 
 
 def update_scenario(scenario: Scenario):
     st.session_state["scenarios"][scenario.scenario_id] = scenario
+    _bump_data_version()
 
 
 def create_baseline_scenario(planning_horizon: int = 6) -> Scenario:
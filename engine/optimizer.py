@@ -2,13 +2,21 @@
 
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
 import pulp
 
 from models.building import Floor
 from models.unit import Unit
 from models.allocation import AllocationRecommendation, FloorAssignment
 from models.attendance import AttendanceProfile
-from config.defaults import PEAK_BUFFER_MULTIPLIER, WORKING_DAYS_PER_WEEK
+from config.defaults import PEAK_BUFFER_MULTIPLIER, WORKING_DAYS_PER_WEEK, DEFAULT_LP_SOLVER
+
+
+_BEFORE_AFTER_COLUMNS = [
+    "Unit", "Demand", "Before Seats", "After Seats", "Seat Change",
+    "Before Floors", "After Floors", "Floor Change",
+]
 
 
 @dataclass
@@ -17,10 +25,11 @@ class OptimizationResult:
     objective_value: float
     assignments: List[FloorAssignment]
     unit_allocations: Dict[str, int]  # unit_name -> total seats
-    before_after: List[dict]  # comparison data
+    before_after_df: pd.DataFrame  # per-unit before/after comparison, one column per metric
     consolidation_suggestions: List[str]
     message: str = ""
     savings_summary: Optional[dict] = None  # for RTO objectives
+    floors_used: int = 0  # distinct floors with at least one seat assigned
 
 
 def _build_adjacency_weights(
@@ -64,6 +73,18 @@ def _compute_rto_demand(att: AttendanceProfile, buffer_mult: float, override_rto
     return max(1, round((base + peak) * (rto / WORKING_DAYS_PER_WEEK)))
 
 
+def _make_solver(solver_method: str, time_limit: int = 30):
+    """PuLP solver for ``solver_method``: "highs" (CBC if highspy is missing) or "cbc"."""
+    if solver_method == "highs":
+        solver = pulp.HiGHS(msg=False, timeLimit=time_limit)
+        if solver.available():
+            return solver
+        return pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit)
+    if solver_method == "cbc":
+        return pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit)
+    raise ValueError(f"Unknown solver_method {solver_method!r}; expected 'highs' or 'cbc'")
+
+
 def optimize_allocation(
     allocations: List[AllocationRecommendation],
     floors: List[Floor],
@@ -78,6 +99,7 @@ def optimize_allocation(
     max_floors_per_unit: Optional[int] = None,
     pinned_tower_ids: Optional[Dict[str, List[str]]] = None,
     min_guarantee_pct: Optional[float] = None,
+    solver_method: str = DEFAULT_LP_SOLVER,
 ) -> OptimizationResult:
     """
     Run LP optimization for seat allocation.
@@ -91,7 +113,10 @@ def optimize_allocation(
     - max_floors_per_unit: each unit uses at most this many floors
     - pinned_tower_ids: {unit_name: [tower_id, ...]} — restrict units to specific towers
     - min_guarantee_pct: each unit receives at least this fraction of its demand
+
+    solver_method selects the MILP backend: "cbc" (default) or "highs" (needs highspy).
     """
+    solver = _make_solver(solver_method)
     cfg = rule_config or {}
     buffer_mult = cfg.get("peak_buffer_multiplier", PEAK_BUFFER_MULTIPLIER)
 
@@ -191,7 +216,7 @@ def optimize_allocation(
                 guaranteed_units.append(u)
 
     # --- Solve ---
-    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=30))
+    prob.solve(solver)
     status = pulp.LpStatus[prob.status]
     relaxed_guarantee = False
 
@@ -201,7 +226,7 @@ def optimize_allocation(
             cname = f"minguarantee_{u}"
             if cname in prob.constraints:
                 del prob.constraints[cname]
-        prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=30))
+        prob.solve(solver)
         status = pulp.LpStatus[prob.status]
         relaxed_guarantee = True
 
@@ -211,7 +236,7 @@ def optimize_allocation(
             objective_value=0,
             assignments=[],
             unit_allocations={},
-            before_after=[],
+            before_after_df=pd.DataFrame(columns=_BEFORE_AFTER_COLUMNS),
             consolidation_suggestions=[],
             message=f"Optimization could not find a solution. Status: {status}",
         )
@@ -219,6 +244,7 @@ def optimize_allocation(
     # --- Extract results ---
     new_assignments = []
     unit_totals = {u: 0 for u in unit_names}
+    used_floor_ids = set()
 
     for u in unit_names:
         for fid in floor_ids:
@@ -234,6 +260,7 @@ def optimize_allocation(
                     adjacency_tier="optimized",
                 ))
                 unit_totals[u] += val
+                used_floor_ids.add(fid)
 
     # Before/After comparison
     old_totals = {}
@@ -252,22 +279,25 @@ def optimize_allocation(
             new_floor_count[a.unit_name] = set()
         new_floor_count[a.unit_name].add((a.tower_id, a.floor_number))
 
-    before_after = []
-    for u in unit_names:
-        before_seats = old_totals.get(u, 0)
-        after_seats = unit_totals.get(u, 0)
-        before_floors = len(old_floor_count.get(u, set()))
-        after_floors = len(new_floor_count.get(u, set()))
-        before_after.append({
-            "Unit": u,
-            "Demand": demand[u],
-            "Before Seats": before_seats,
-            "After Seats": after_seats,
-            "Seat Change": after_seats - before_seats,
-            "Before Floors": before_floors,
-            "After Floors": after_floors,
-            "Floor Change": after_floors - before_floors,
-        })
+    n_units = len(unit_names)
+    before_seats = np.fromiter((old_totals.get(u, 0) for u in unit_names), dtype=np.int64, count=n_units)
+    after_seats = np.fromiter((unit_totals[u] for u in unit_names), dtype=np.int64, count=n_units)
+    before_floors = np.fromiter(
+        (len(old_floor_count.get(u, ())) for u in unit_names), dtype=np.int64, count=n_units,
+    )
+    after_floors = np.fromiter(
+        (len(new_floor_count.get(u, ())) for u in unit_names), dtype=np.int64, count=n_units,
+    )
+    before_after_df = pd.DataFrame({
+        "Unit": unit_names,
+        "Demand": [demand[u] for u in unit_names],
+        "Before Seats": before_seats,
+        "After Seats": after_seats,
+        "Seat Change": after_seats - before_seats,
+        "Before Floors": before_floors,
+        "After Floors": after_floors,
+        "Floor Change": after_floors - before_floors,
+    }, columns=_BEFORE_AFTER_COLUMNS)
 
     # Consolidation suggestions
     suggestions = []
@@ -318,8 +348,9 @@ def optimize_allocation(
         objective_value=pulp.value(prob.objective) or 0,
         assignments=new_assignments,
         unit_allocations=unit_totals,
-        before_after=before_after,
+        before_after_df=before_after_df,
         consolidation_suggestions=suggestions,
         message=msg,
         savings_summary=savings,
+        floors_used=len(used_floor_ids),
     )
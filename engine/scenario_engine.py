@@ -114,6 +114,7 @@ def run_scenario(
     scenario.allocation_results = allocations
     scenario.floor_assignments = assignments
     scenario.last_run_at = datetime.now()
+    scenario.is_stale = False
 
     return scenario
 
@@ -187,6 +187,7 @@ def get_floor_utilization(
             "utilization_pct": used / f.total_seats if f.total_seats > 0 else 0,
             "unit_count": len(units),
             "units": units,
+            "units_str": ", ".join(f"{u}: {s}" for u, s in units.items()) if units else "—",
         })
     return results
 
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class AllocationRecommendation:
     unit_name: str
     recommended_alloc_pct: float    # e.g. 0.75 for 75%
@@ -16,7 +16,7 @@ class AllocationRecommendation:
     override_rationale: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class FloorAssignment:
     unit_name: str
     building_id: str
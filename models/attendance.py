@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class AttendanceProfile:
     unit_name: str
     monthly_median_hc: float
@@ -35,3 +35,4 @@ class Scenario:
     allocation_results: List = field(default_factory=list)
     floor_assignments: List = field(default_factory=list)
     last_run_at: Optional[datetime] = None
+    is_stale: bool = False  # base data edited since last run
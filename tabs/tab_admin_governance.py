@@ -2,6 +2,7 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
 
@@ -15,11 +16,50 @@ from data.session_store import (
     get_scenarios, get_active_scenario_id, add_scenario, remove_scenario,
     update_scenario, create_baseline_scenario, get_audit_log, get_rule_config,
     set_rule_config, add_audit_entry, is_data_loaded, set_last_data_edit,
+    get_total_seats,
 )
 from models.scenario import Scenario, ScenarioParams
 from config.defaults import SCENARIO_TYPES, PLANNING_BUFFER_PRESETS, DEFAULT_PLANNING_BUFFER
 
 
+def _changed_unit_rows(units, edited_df, tol: float = 0.001) -> np.ndarray:
+    """Return row indices of units whose edited values differ from the stored ones.
+
+    Compares whole columns at once so only the changed rows are parsed and audited.
+    """
+    n = len(units)
+    hc_old = np.fromiter((u.current_total_hc for u in units), dtype=np.int64, count=n)
+    g_old = np.fromiter((u.hc_growth_pct for u in units), dtype=np.float64, count=n)
+    a_old = np.fromiter((u.attrition_pct for u in units), dtype=np.float64, count=n)
+    alloc_old = np.fromiter(
+        (u.seat_alloc_pct if u.seat_alloc_pct is not None else np.nan for u in units),
+        dtype=np.float64, count=n,
+    )
+    pri_old = np.array([u.business_priority if u.business_priority is not None else "None"
+                        for u in units], dtype=object)
+
+    hc_new = edited_df["Current Total HC"].to_numpy(dtype=np.int64)
+    g_new = edited_df["Growth %"].to_numpy(dtype=np.float64) / 100.0
+    a_new = edited_df["Attrition %"].to_numpy(dtype=np.float64) / 100.0
+    alloc_new = pd.to_numeric(edited_df["Seat Alloc %"], errors="coerce").to_numpy(dtype=np.float64) / 100.0
+    pri_new = edited_df["Priority"].to_numpy(dtype=object)
+
+    alloc_nan_old = np.isnan(alloc_old)
+    alloc_nan_new = np.isnan(alloc_new)
+    alloc_changed = (alloc_nan_old != alloc_nan_new) | (
+        ~alloc_nan_old & ~alloc_nan_new & (np.abs(alloc_new - alloc_old) > tol)
+    )
+
+    mask = (
+        (hc_new != hc_old)
+        | (np.abs(g_new - g_old) > tol)
+        | (np.abs(a_new - a_old) > tol)
+        | (pri_new != pri_old)
+        | alloc_changed
+    )
+    return np.flatnonzero(mask)
+
+
 def _load_and_validate(buildings_df, units_df, attendance_df):
     """Validate and store uploaded data."""
     errors = []
@@ -65,7 +105,7 @@ def _load_and_validate(buildings_df, units_df, attendance_df):
     st.success(f"Data loaded: {len(floors)} floors, {len(units)} units, {len(attendance)} attendance profiles")
 
     # --- Immediate supply vs demand health check ---
-    total_seats = sum(f.total_seats for f in floors)
+    total_seats = get_total_seats()
     total_hc = sum(u.current_total_hc for u in units)
     att_map = {a.unit_name: a for a in attendance}
     total_median = sum(att_map[u.unit_name].monthly_median_hc
@@ -275,8 +315,10 @@ def render(sidebar_state):
                 )
 
                 if st.button("Save Unit Changes", key="btn_save_units"):
-                    changed = False
-                    for i, u in enumerate(current_units):
+                    changed_idx = _changed_unit_rows(current_units, edited_units)
+                    changed = len(changed_idx) > 0
+                    for i in changed_idx:
+                        u = current_units[i]
                         row = edited_units.iloc[i]
                         new_hc = int(row["Current Total HC"])
                         new_growth = float(row["Growth %"]) / 100.0
@@ -285,24 +327,18 @@ def render(sidebar_state):
                         raw_alloc = row["Seat Alloc %"]
                         new_seat_alloc = float(raw_alloc) / 100.0 if pd.notna(raw_alloc) else None
 
-                        if (new_hc != u.current_total_hc or
-                            abs(new_growth - u.hc_growth_pct) > 0.001 or
-                            abs(new_attrition - u.attrition_pct) > 0.001 or
-                            new_priority != u.business_priority or
-                            new_seat_alloc != u.seat_alloc_pct):
-                            add_audit_entry(
-                                "edit_base_data", "baseline", "unit_data",
-                                f"HC={u.current_total_hc},G={u.hc_growth_pct:.1%},A={u.attrition_pct:.1%}",
-                                f"HC={new_hc},G={new_growth:.1%},A={new_attrition:.1%},Alloc={new_seat_alloc}",
-                                unit_name=u.unit_name,
-                                rationale="Manual unit data edit",
-                            )
-                            u.current_total_hc = new_hc
-                            u.hc_growth_pct = new_growth
-                            u.attrition_pct = new_attrition
-                            u.business_priority = new_priority
-                            u.seat_alloc_pct = new_seat_alloc
-                            changed = True
+                        add_audit_entry(
+                            "edit_base_data", "baseline", "unit_data",
+                            f"HC={u.current_total_hc},G={u.hc_growth_pct:.1%},A={u.attrition_pct:.1%}",
+                            f"HC={new_hc},G={new_growth:.1%},A={new_attrition:.1%},Alloc={new_seat_alloc}",
+                            unit_name=u.unit_name,
+                            rationale="Manual unit data edit",
+                        )
+                        u.current_total_hc = new_hc
+                        u.hc_growth_pct = new_growth
+                        u.attrition_pct = new_attrition
+                        u.business_priority = new_priority
+                        u.seat_alloc_pct = new_seat_alloc
                     if changed:
                         set_units(current_units)
                         set_last_data_edit()
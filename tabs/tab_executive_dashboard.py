@@ -2,17 +2,172 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+from collections import defaultdict
 
 from data.session_store import (
-    get_active_scenario, get_floors, get_units, get_attendance,
-    get_rule_config, is_data_loaded, get_last_data_edit,
+    get_active_scenario, get_floors, is_data_loaded, get_data_version,
+    get_total_seats, get_scenario_rto, get_scenario_floor_util,
 )
 from components.metrics_cards import render_metric_row
 from components.charts import capacity_vs_demand_bar, utilization_donut, rto_need_vs_allocated_bar
-from engine.spatial import get_floor_utilization
-from engine.allocation_engine import compute_rto_alerts
-from engine.scenario_engine import apply_floor_modifications, apply_overrides
-from config.defaults import FLOOR_SATURATION_THRESHOLD, UNIT_SHORTFALL_THRESHOLD
+from engine.scenario_engine import apply_floor_modifications
+from config.defaults import FLOOR_SATURATION_THRESHOLD, UNIT_SHORTFALL_THRESHOLD, MAX_ALERTS_SHOWN
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _tower_summary(rows: tuple) -> list:
+    """Sum total/used seats per tower from (tower_id, total_seats, used_seats) rows."""
+    totals = defaultdict(lambda: [0, 0])
+    for tid, total_seats, used_seats in rows:
+        totals[tid][0] += total_seats
+        totals[tid][1] += used_seats
+    return [
+        {"tower_id": tid, "total_seats": total_seats, "used_seats": used_seats}
+        for tid, (total_seats, used_seats) in totals.items()
+    ]
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cap_demand_fig(rows: tuple):
+    """Capacity vs demand bar chart from (tower_id, total_seats, used_seats) rows."""
+    fig = capacity_vs_demand_bar(_tower_summary(rows))
+    fig.update_layout(uirevision="capacity_vs_demand")
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _util_donut(allocated: int, total: int):
+    """Overall utilization donut for the given allocated/total seats."""
+    fig = utilization_donut(allocated, total)
+    fig.update_layout(uirevision="utilization")
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cross_building_units(scenario_id, last_run_at, data_version, _assignments) -> dict:
+    """unit_name -> {building_id: floor count} for units spread over several buildings."""
+    df = pd.DataFrame(
+        [(a.unit_name, a.building_id) for a in _assignments], columns=["unit", "building"],
+    )
+    if df.empty:
+        return {}
+    counts = df.groupby(["unit", "building"]).size()
+    bldgs_per_unit = counts.groupby(level=0).size()
+    return {
+        unit_name: {bid: int(cnt) for bid, cnt in counts.loc[unit_name].items()}
+        for unit_name in bldgs_per_unit.index[bldgs_per_unit > 1]
+    }
+
+
+def _truncated_alerts_note(n_total, table_idx, file_name, scenario,
+                           floor_util, allocations, demand_arr, gaps, cross_bldg_units):
+    """Caption for a capped alert table with a download of the full list."""
+    st.caption(f"Showing the first {MAX_ALERTS_SHOWN} of {n_total} alerts.")
+    csv_tables = _full_alerts_csv(
+        scenario.scenario_id, scenario.last_run_at, get_data_version(),
+        floor_util, allocations, demand_arr, gaps, cross_bldg_units,
+    )
+    st.download_button(
+        "Export full list (CSV)", data=csv_tables[table_idx],
+        file_name=file_name, mime="text/csv", key=f"dl_{file_name}",
+    )
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _eff_floors(data_version, excluded: tuple, capacity_reduction: float, _floors, _scenario) -> tuple:
+    """Scenario-adjusted floors and their total seats."""
+    effective_floors = apply_floor_modifications(_floors, _scenario)
+    return effective_floors, sum(f.total_seats for f in effective_floors)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _scenario_notes(excluded: tuple, capacity_reduction: float, effective: int, raw: int) -> str:
+    """Human-readable summary of the scenario's supply adjustments."""
+    notes = []
+    if excluded:
+        notes.append(f"{len(excluded)} floors excluded ({', '.join(excluded)})")
+    if capacity_reduction > 0:
+        notes.append(f"{capacity_reduction:.0%} capacity reduction applied")
+    return (f"Scenario adjustments: {'; '.join(notes)}. "
+            f"Effective supply is {effective:,} seats (base: {raw:,}).")
+
+
+def _collect_alerts(floor_util, allocations, demand_arr, gaps, cross_bldg_units, limit=None) -> tuple:
+    """Capacity and other alert columns, each capped at ``limit`` rows, plus full counts.
+
+    Matching rows are found with array masks, so rows past the cap are counted
+    but never formatted.
+    """
+    cap_floor, cap_status, cap_used_total, cap_util = [], [], [], []
+    other_unit, other_alert, other_detail = [], [], []
+
+    # Floor saturation alerts
+    n_saturated = 0
+    if floor_util:
+        fu_df = pd.DataFrame(floor_util)
+        sat = fu_df[fu_df["utilization_pct"] > FLOOR_SATURATION_THRESHOLD]
+        n_saturated = len(sat)
+        sat = sat.head(limit)
+        # Format whole columns at once rather than one f-string per floor
+        cap_floor.extend(sat["floor_id"].tolist())
+        cap_status.extend(["Saturated"] * len(sat))
+        cap_used_total.extend(
+            (sat["used_seats"].astype(str) + " / " + sat["total_seats"].astype(str)).tolist()
+        )
+        cap_util.extend(
+            ((sat["utilization_pct"] * 100).round().astype(int).astype(str) + "%").tolist()
+        )
+
+    # Unit shortfall alerts
+    gap_pct = np.divide(gaps, demand_arr, out=np.zeros(len(gaps)), where=demand_arr > 0)
+    shortfall_idx = np.flatnonzero((demand_arr > 0) & (gap_pct < UNIT_SHORTFALL_THRESHOLD))
+    for i in shortfall_idx.tolist():
+        if limit is not None and len(cap_floor) >= limit:
+            break
+        a = allocations[i]
+        cap_floor.append(a.unit_name)
+        cap_status.append("Shortfall")
+        cap_used_total.append(f"{a.allocated_seats} / {a.effective_demand_seats}")
+        cap_util.append(f"{gap_pct[i]:+.0%}")
+
+    # Fragmentation alerts
+    frag_arr = np.fromiter((a.fragmentation_score for a in allocations), dtype=float, count=len(allocations))
+    frag_idx = np.flatnonzero(frag_arr > 0.7)
+    for i in frag_idx.tolist():
+        if limit is not None and len(other_unit) >= limit:
+            break
+        other_unit.append(allocations[i].unit_name)
+        other_alert.append("High Fragmentation")
+        other_detail.append(f"Score: {frag_arr[i]:.2f}")
+
+    # Cross-building spread alerts
+    for unit_name, bldgs in cross_bldg_units.items():
+        if limit is not None and len(other_unit) >= limit:
+            break
+        detail_parts = [f"{bid} ({cnt} floor{'s' if cnt > 1 else ''})"
+                        for bid, cnt in sorted(bldgs.items())]
+        other_unit.append(unit_name)
+        other_alert.append("Cross-Building Spread")
+        other_detail.append(f"Across {', '.join(detail_parts)}")
+
+    capacity = {"Floor": cap_floor, "Status": cap_status,
+                "Used / Total": cap_used_total, "Utilization": cap_util}
+    other = {"Unit": other_unit, "Alert": other_alert, "Detail": other_detail}
+    n_capacity = n_saturated + len(shortfall_idx)
+    n_other = len(frag_idx) + len(cross_bldg_units)
+    return capacity, n_capacity, other, n_other
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _full_alerts_csv(scenario_id, last_run_at, data_version,
+                     _floor_util, _allocations, _demand_arr, _gaps, _cross_bldg_units) -> tuple:
+    """Uncapped capacity and other alert tables as CSV text, for download."""
+    capacity, _, other, _ = _collect_alerts(
+        _floor_util, _allocations, _demand_arr, _gaps, _cross_bldg_units,
+    )
+    return pd.DataFrame(capacity).to_csv(index=False), pd.DataFrame(other).to_csv(index=False)
 
 
 def render(sidebar_state):
@@ -28,9 +183,14 @@ def render(sidebar_state):
         st.info("No allocation results available. Run a simulation from the Scenario Lab.")
         return
 
+    _dashboard_body(scenario)
+
+
+@st.fragment
+def _dashboard_body(scenario):
+    """KPIs, charts and alerts; runs as a fragment so widgets inside rerun only this body."""
     # Stale-data warning
-    last_edit = get_last_data_edit()
-    if last_edit and (scenario.last_run_at is None or last_edit > scenario.last_run_at):
+    if scenario.is_stale:
         st.warning(
             "Base data has changed since the last simulation. "
             "Go to Scenario Lab and re-run to see updated results."
@@ -41,16 +201,22 @@ def render(sidebar_state):
     floors = get_floors()
 
     # Compute effective supply (accounting for scenario exclusions + capacity reduction)
-    effective_floors = apply_floor_modifications(floors, scenario)
-    raw_total_seats = sum(f.total_seats for f in floors)
-    effective_total_seats = sum(f.total_seats for f in effective_floors)
+    effective_floors, effective_total_seats = _eff_floors(
+        get_data_version(), tuple(scenario.params.excluded_floors),
+        scenario.params.capacity_reduction_pct, floors, scenario,
+    )
+    raw_total_seats = get_total_seats()
     has_scenario_adjustments = effective_total_seats < raw_total_seats
 
     # --- KPI Metrics ---
-    total_demand = sum(a.effective_demand_seats for a in allocations)
-    total_allocated = sum(a.allocated_seats for a in allocations)
-    seat_gap = total_allocated - total_demand
-    impacted_units = sum(1 for a in allocations if a.seat_gap < 0)
+    n_allocs = len(allocations)
+    demand_arr = np.fromiter((a.effective_demand_seats for a in allocations), dtype=np.int64, count=n_allocs)
+    allocated_arr = np.fromiter((a.allocated_seats for a in allocations), dtype=np.int64, count=n_allocs)
+    gaps = allocated_arr - demand_arr
+    total_demand = int(demand_arr.sum())
+    total_allocated = int(allocated_arr.sum())
+    seat_gap = int(gaps.sum())
+    impacted_units = int((gaps < 0).sum())
 
     supply_label = "Effective Supply" if has_scenario_adjustments else "Total Seats (Supply)"
     supply_metrics = {"label": supply_label, "value": f"{effective_total_seats:,}"}
@@ -70,13 +236,10 @@ def render(sidebar_state):
 
     # Scenario adjustment info
     if has_scenario_adjustments:
-        notes = []
-        if scenario.params.excluded_floors:
-            notes.append(f"{len(scenario.params.excluded_floors)} floors excluded ({', '.join(scenario.params.excluded_floors)})")
-        if scenario.params.capacity_reduction_pct > 0:
-            notes.append(f"{scenario.params.capacity_reduction_pct:.0%} capacity reduction applied")
-        st.info(f"Scenario adjustments: {'; '.join(notes)}. "
-                f"Effective supply is {effective_total_seats:,} seats (base: {raw_total_seats:,}).")
+        st.info(_scenario_notes(
+            tuple(scenario.params.excluded_floors), scenario.params.capacity_reduction_pct,
+            effective_total_seats, raw_total_seats,
+        ))
 
     st.divider()
 
@@ -85,20 +248,14 @@ def render(sidebar_state):
 
     with col1:
         # Capacity vs demand by tower
-        floor_util = get_floor_utilization(floors, assignments)
-        tower_summary = {}
-        for fu in floor_util:
-            tid = fu["tower_id"]
-            if tid not in tower_summary:
-                tower_summary[tid] = {"tower_id": tid, "total_seats": 0, "used_seats": 0}
-            tower_summary[tid]["total_seats"] += fu["total_seats"]
-            tower_summary[tid]["used_seats"] += fu["used_seats"]
-
-        fig = capacity_vs_demand_bar(list(tower_summary.values()))
+        floor_util = get_scenario_floor_util(scenario)
+        fig = _cap_demand_fig(
+            tuple((fu["tower_id"], fu["total_seats"], fu["used_seats"]) for fu in floor_util)
+        )
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
-        fig = utilization_donut(total_allocated, effective_total_seats)
+        fig = _util_donut(total_allocated, effective_total_seats)
         st.plotly_chart(fig, use_container_width=True)
 
     st.divider()
@@ -106,92 +263,55 @@ def render(sidebar_state):
     # --- Alerts ---
     st.subheader("Planning Alerts")
 
-    # Collect alerts by category
-    capacity_alerts = []
-    rto_alerts_list = []
-    other_alerts = []
-
-    # Floor saturation alerts
-    for fu in floor_util:
-        if fu["utilization_pct"] > FLOOR_SATURATION_THRESHOLD:
-            capacity_alerts.append({
-                "Floor": fu["floor_id"],
-                "Status": "Saturated",
-                "Used / Total": f"{fu['used_seats']} / {fu['total_seats']}",
-                "Utilization": f"{fu['utilization_pct']:.0%}",
-            })
-
-    # Unit shortfall alerts
-    for a in allocations:
-        if a.effective_demand_seats > 0:
-            gap_pct = a.seat_gap / a.effective_demand_seats
-            if gap_pct < UNIT_SHORTFALL_THRESHOLD:
-                capacity_alerts.append({
-                    "Floor": a.unit_name,
-                    "Status": "Shortfall",
-                    "Used / Total": f"{a.allocated_seats} / {a.effective_demand_seats}",
-                    "Utilization": f"{gap_pct:+.0%}",
-                })
-
-    # RTO compliance alerts (units below global RTO target)
-    units = get_units()
-    attendance_profiles = get_attendance()
-    att_map = {a.unit_name: a for a in attendance_profiles}
+    # RTO alerts are collected column-wise (one list per output column)
+    rto_unit, rto_alert, rto_allocated, rto_need = [], [], [], []
 
     # RTO utilization data (use scenario-modified attendance for RTO mandate)
-    _, scenario_att_map = apply_overrides(units, att_map, scenario)
-    rto_alerts_data = compute_rto_alerts(allocations, units, scenario_att_map, get_rule_config())
-    rto_chart_data = [ra for ra in rto_alerts_data if ra["status"] != "Aligned"]
+    _, rto_alerts_data, _ = get_scenario_rto(scenario)
     rto_all_data = rto_alerts_data  # all units for chart
-    for ra in rto_chart_data:
-        rto_alerts_list.append({
-            "Unit": ra["unit_name"],
-            "Alert": ra["status"],
-            "Allocated": ra["allocated_seats"],
-            "RTO Need": ra["expected_seats"],
-        })
+    for ra in rto_alerts_data:
+        if ra["status"] != "Aligned":
+            rto_unit.append(ra["unit_name"])
+            rto_alert.append(ra["status"])
+            rto_allocated.append(ra["allocated_seats"])
+            rto_need.append(ra["expected_seats"])
 
-    # Fragmentation alerts
-    for a in allocations:
-        if a.fragmentation_score > 0.7:
-            other_alerts.append({
-                "Unit": a.unit_name,
-                "Alert": "High Fragmentation",
-                "Detail": f"Score: {a.fragmentation_score:.2f}",
-            })
-
-    # Cross-building spread alerts
-    from collections import defaultdict
-    unit_bldg_map = defaultdict(lambda: defaultdict(int))
-    for a in assignments:
-        unit_bldg_map[a.unit_name][a.building_id] += 1
-    for unit_name, bldgs in unit_bldg_map.items():
-        if len(bldgs) > 1:
-            detail_parts = [f"{bid} ({cnt} floor{'s' if cnt > 1 else ''})"
-                            for bid, cnt in sorted(bldgs.items())]
-            other_alerts.append({
-                "Unit": unit_name,
-                "Alert": "Cross-Building Spread",
-                "Detail": f"Across {', '.join(detail_parts)}",
-            })
-
-    has_any = capacity_alerts or rto_all_data or other_alerts
+    # Capacity, fragmentation and cross-building alerts (tables capped for display)
+    cross_bldg_units = _cross_building_units(
+        scenario.scenario_id, scenario.last_run_at, get_data_version(), assignments,
+    )
+    capacity_alerts, n_capacity, other_alerts, n_other = _collect_alerts(
+        floor_util, allocations, demand_arr, gaps, cross_bldg_units, limit=MAX_ALERTS_SHOWN,
+    )
+    n_rto = len(rto_unit)
+    has_any = n_capacity or rto_all_data or n_other
 
     if not has_any:
         st.success("No planning alerts — all metrics within acceptable ranges.")
     else:
-        if capacity_alerts:
-            st.error(f"{len(capacity_alerts)} Capacity Alert{'s' if len(capacity_alerts) != 1 else ''}")
-            st.dataframe(pd.DataFrame(capacity_alerts), use_container_width=True, hide_index=True)
+        if n_capacity:
+            st.error(f"{n_capacity} Capacity Alert{'s' if n_capacity != 1 else ''}")
+            st.dataframe(pa.table(capacity_alerts), use_container_width=True, hide_index=True)
+            if n_capacity > MAX_ALERTS_SHOWN:
+                _truncated_alerts_note(n_capacity, 0, "capacity_alerts.csv", scenario,
+                                       floor_util, allocations, demand_arr, gaps, cross_bldg_units)
 
         if rto_all_data:
             st.subheader("RTO-Based Need vs Allocated")
             fig = rto_need_vs_allocated_bar(rto_all_data)
             st.plotly_chart(fig, use_container_width=True)
-            if rto_alerts_list:
-                st.warning(f"{len(rto_alerts_list)} unit{'s' if len(rto_alerts_list) != 1 else ''} with allocation mismatch")
-                st.dataframe(pd.DataFrame(rto_alerts_list), use_container_width=True, hide_index=True)
+            if n_rto:
+                st.warning(f"{n_rto} unit{'s' if n_rto != 1 else ''} with allocation mismatch")
+                st.dataframe(pa.table({
+                    "Unit": rto_unit,
+                    "Alert": rto_alert,
+                    "Allocated": rto_allocated,
+                    "RTO Need": rto_need,
+                }), use_container_width=True, hide_index=True)
 
-        if other_alerts:
-            st.info(f"{len(other_alerts)} Other Alert{'s' if len(other_alerts) != 1 else ''}")
-            st.dataframe(pd.DataFrame(other_alerts), use_container_width=True, hide_index=True)
+        if n_other:
+            st.info(f"{n_other} Other Alert{'s' if n_other != 1 else ''}")
+            st.dataframe(pa.table(other_alerts), use_container_width=True, hide_index=True)
+            if n_other > MAX_ALERTS_SHOWN:
+                _truncated_alerts_note(n_other, 1, "other_alerts.csv", scenario,
+                                       floor_util, allocations, demand_arr, gaps, cross_bldg_units)
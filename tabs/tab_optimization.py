@@ -1,18 +1,81 @@
 """Tab 5: Optimization & Recommendations — LP-based best-fit allocations."""
 
+import hashlib
+import pickle
+from types import SimpleNamespace
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 
 from data.session_store import (
     get_active_scenario, get_floors, get_units, get_rule_config,
-    get_attendance,
-    update_scenario, add_audit_entry, is_data_loaded,
+    get_scenario_rto,
+    update_scenario, add_audit_entry, is_data_loaded, get_data_version,
+    get_total_seats,
 )
-from engine.optimizer import optimize_allocation
-from engine.scenario_engine import apply_floor_modifications, apply_overrides
+from engine.scenario_engine import apply_floor_modifications
 from components.tables import render_comparison_table
-from config.defaults import PLANNING_BUFFER_PRESETS
+from config.defaults import PLANNING_BUFFER_PRESETS, DEFAULT_LP_SOLVER
+
+
+def _sig(obj) -> str:
+    """Stable digest of a picklable object, for use as a cache key."""
+    return hashlib.blake2b(pickle.dumps(obj, protocol=5), digest_size=16).hexdigest()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _derive_ui_state(data_version, scenario_id, excluded: tuple, capacity_reduction: float,
+                     _raw_floors, _units, _scenario) -> SimpleNamespace:
+    """Scenario-adjusted floors plus the unit/tower lists and seat total the tab renders from."""
+    effective_floors = apply_floor_modifications(_raw_floors, _scenario)
+    return SimpleNamespace(
+        effective_floors=effective_floors,
+        unit_names=[u.unit_name for u in _units],
+        tower_ids=sorted({f.tower_id for f in effective_floors}),
+        effective_total=sum(f.total_seats for f in effective_floors),
+    )
+
+
+@st.cache_data(ttl=900, max_entries=32, show_spinner=False)
+def _cached_optimize(payload_hash: str, _kwargs: dict):
+    """optimize_allocation result, cached on a digest of its pickled keyword arguments."""
+    from engine.optimizer import optimize_allocation
+    return optimize_allocation(**_kwargs)
+
+
+def _optimize(**kwargs):
+    """Run (or reuse) an optimization for identical inputs."""
+    payload_hash = _sig(kwargs)
+    return _cached_optimize(payload_hash, kwargs)
+
+
+@st.cache_data(ttl=900, max_entries=16, show_spinner=False)
+def _cached_sensitivity(payload_hash: str, _kwargs: dict) -> dict:
+    """preset name -> optimization result for every planning buffer preset."""
+    from engine.optimizer import optimize_allocation
+    base_config = _kwargs["rule_config"]
+    return {
+        preset_name: optimize_allocation(**{**_kwargs, "rule_config": {
+            **base_config, "peak_buffer_multiplier": preset_cfg["peak_buffer_multiplier"],
+        }})
+        for preset_name, preset_cfg in PLANNING_BUFFER_PRESETS.items()
+    }
+
+
+def _sensitivity_sweep(**kwargs) -> dict:
+    """Run (or reuse) the buffer-preset sensitivity sweep for identical inputs."""
+    payload_hash = _sig(kwargs)
+    return _cached_sensitivity(payload_hash, kwargs)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _history_df(rows: tuple) -> pd.DataFrame:
+    """Optimization history table from (time, objective, seats, floors, status) rows."""
+    return pd.DataFrame(
+        list(rows), columns=["Time", "Objective", "Total Seats", "Floors Used", "Status"],
+    )
 
 
 def render(sidebar_state):
@@ -48,17 +111,19 @@ def render(sidebar_state):
     # --- Compute effective floors + attendance ---
     config = get_rule_config()
     raw_floors = get_floors()
-    effective_floors = apply_floor_modifications(raw_floors, scenario)
     units = get_units()
-    unit_names = [u.unit_name for u in units]
-    tower_ids = sorted(set(f.tower_id for f in effective_floors))
+    ui_state = _derive_ui_state(
+        get_data_version(), scenario.scenario_id, tuple(scenario.params.excluded_floors),
+        scenario.params.capacity_reduction_pct, raw_floors, units, scenario,
+    )
+    effective_floors = ui_state.effective_floors
+    unit_names = ui_state.unit_names
+    tower_ids = ui_state.tower_ids
 
-    raw_total = sum(f.total_seats for f in raw_floors)
-    effective_total = sum(f.total_seats for f in effective_floors)
+    raw_total = get_total_seats()
+    effective_total = ui_state.effective_total
 
-    att_profiles = get_attendance()
-    att_map_raw = {a.unit_name: a for a in att_profiles}
-    _, scenario_att_map = apply_overrides(units, att_map_raw, scenario)
+    scenario_att_map, _, _ = get_scenario_rto(scenario)
 
     # --- Objective Selection ---
     st.subheader("Optimization Objective")
@@ -130,25 +195,21 @@ def render(sidebar_state):
                     help="Each unit receives at least this % of their demand even under scarcity."
                 ) / 100.0
 
-        st.markdown("**Pin units to specific towers** (leave blank = no restriction)")
+        st.markdown("**Pin units to specific towers** (untick towers a unit may not use)")
         pin_data = {}
         if tower_ids:
-            pin_rows = []
-            saved_pins = st.session_state.get("opt_pin_selections", {})
-            for uname in unit_names:
-                default = saved_pins.get(uname, tower_ids)
-                selected = st.multiselect(
-                    uname, options=tower_ids, default=default,
-                    key=f"opt_pin_{uname}",
-                    label_visibility="visible",
-                )
-                pin_data[uname] = selected if selected != tower_ids else None
-
-        # Store pin selections
-        st.session_state["opt_pin_selections"] = {
-            uname: st.session_state.get(f"opt_pin_{uname}", tower_ids)
-            for uname in unit_names
-        }
+            # One grid widget (units x towers) instead of a multiselect per unit.
+            # data_editor replays edits by row/column position, so the key changes
+            # whenever the scenario or its unit/tower lists do.
+            pin_df = pd.DataFrame(True, index=pd.Index(unit_names, name="Unit"), columns=tower_ids)
+            pin_key = f"opt_pin_grid_{scenario.scenario_id}_{_sig((unit_names, tower_ids))}"
+            edited_pins = st.data_editor(
+                pin_df, use_container_width=True, key=pin_key,
+                column_config={t: st.column_config.CheckboxColumn(t) for t in tower_ids},
+            )
+            restricted = edited_pins[~edited_pins.all(axis=1)]
+            for uname, row in zip(restricted.index, restricted.to_numpy()):
+                pin_data[uname] = [t for t, allowed in zip(tower_ids, row) if allowed]
 
     # Build pinned_tower_ids dict (only units with restrictions)
     pinned_tower_ids = {
@@ -159,6 +220,10 @@ def render(sidebar_state):
 
     st.divider()
 
+    # Latest result per scenario/objective for this session, valid until the scenario is re-run
+    opt_results = st.session_state.setdefault("optimization_results", {})
+    opt_key = (scenario.scenario_id, selected_obj, target_rto)
+
     # --- Run Optimization ---
     col1, col2 = st.columns([1, 3])
     with col1:
@@ -169,7 +234,7 @@ def render(sidebar_state):
 
     if run_opt:
         with st.spinner("Running optimization..."):
-            result = optimize_allocation(
+            result = _optimize(
                 allocations=scenario.allocation_results,
                 floors=effective_floors,
                 baseline_assignments=scenario.floor_assignments,
@@ -182,6 +247,7 @@ def render(sidebar_state):
                 max_floors_per_unit=max_floors_val if max_floors_enabled else None,
                 pinned_tower_ids=pinned_tower_ids,
                 min_guarantee_pct=min_guar_val if min_guar_enabled else None,
+                solver_method=DEFAULT_LP_SOLVER,
             )
 
         # Store in history (last 3 runs)
@@ -190,38 +256,36 @@ def render(sidebar_state):
             "timestamp": datetime.now().strftime("%H:%M:%S"),
             "objective": objectives[selected_obj].split(" —")[0],
             "total_seats": sum(result.unit_allocations.values()),
-            "floors_used": len(set((a.tower_id, a.floor_number) for a in result.assignments)),
+            "floors_used": result.floors_used,
             "status": result.status,
-            "result": result,
         })
         st.session_state["optimization_history"] = history[:3]
-        st.session_state["optimization_result"] = result
+        opt_results[opt_key] = (scenario.last_run_at, result)
 
     if run_sensitivity:
         with st.spinner("Running sensitivity analysis (Lean / Balanced / Conservative)..."):
             sensitivity_rows = []
             alloc_total = sum(a.effective_demand_seats for a in scenario.allocation_results)
+            sweep = _sensitivity_sweep(
+                allocations=scenario.allocation_results,
+                floors=effective_floors,
+                baseline_assignments=scenario.floor_assignments,
+                objective=selected_obj,
+                excluded_floor_ids=[],
+                units=units,
+                attendance_map=scenario_att_map,
+                rule_config=config,
+                target_rto_days=target_rto,
+                solver_method=DEFAULT_LP_SOLVER,
+            )
             for preset_name, preset_cfg in PLANNING_BUFFER_PRESETS.items():
-                sens_config = dict(config)
-                sens_config["peak_buffer_multiplier"] = preset_cfg["peak_buffer_multiplier"]
-                r = optimize_allocation(
-                    allocations=scenario.allocation_results,
-                    floors=effective_floors,
-                    baseline_assignments=scenario.floor_assignments,
-                    objective=selected_obj,
-                    excluded_floor_ids=[],
-                    units=units,
-                    attendance_map=scenario_att_map,
-                    rule_config=sens_config,
-                    target_rto_days=target_rto,
-                )
+                r = sweep[preset_name]
                 opt_seats = sum(r.unit_allocations.values())
-                floors_used = len(set((a.tower_id, a.floor_number) for a in r.assignments))
                 sensitivity_rows.append({
                     "Buffer Preset": preset_name.capitalize(),
                     "Peak Buffer Multiplier": preset_cfg["peak_buffer_multiplier"],
                     "Optimized Seats": opt_seats,
-                    "Floors Used": floors_used,
+                    "Floors Used": r.floors_used,
                     "vs Allocation Rule": f"{opt_seats - alloc_total:+,}",
                 })
             st.session_state["sensitivity_result"] = sensitivity_rows
@@ -235,7 +299,8 @@ def render(sidebar_state):
         st.dataframe(sens_df, use_container_width=True, hide_index=True)
 
     # --- Display Optimization Results ---
-    result = st.session_state.get("optimization_result")
+    entry = opt_results.get(opt_key)
+    result = entry[1] if entry and entry[0] == scenario.last_run_at else None
     if result:
         st.divider()
         st.subheader("Optimization Results")
@@ -268,21 +333,24 @@ def render(sidebar_state):
 
         # Before/After comparison
         st.subheader("Before / After Comparison")
-        if result.before_after:
-            ba_df = pd.DataFrame(result.before_after)
+        ba_df = result.before_after_df
+        if not ba_df.empty:
             render_comparison_table(ba_df)
 
-            total_before = sum(r["Before Seats"] for r in result.before_after)
-            total_after = sum(r["After Seats"] for r in result.before_after)
-            total_floors_before = sum(r["Before Floors"] for r in result.before_after)
-            total_floors_after = sum(r["After Floors"] for r in result.before_after)
+            # One 2-D array, reduced column-wise in a single pass
+            ba_arr = ba_df[
+                ["Before Seats", "After Seats", "Before Floors", "After Floors", "Floor Change"]
+            ].to_numpy(dtype=np.int64)
+            total_before, total_after, total_floors_before, total_floors_after = (
+                ba_arr[:, :4].sum(axis=0).tolist()
+            )
+            units_consolidated = int(np.count_nonzero(ba_arr[:, 4] < 0))
 
             col1, col2, col3 = st.columns(3)
             col1.metric("Total Seats", f"{total_after:,}", delta=f"{total_after - total_before:+,}")
             col2.metric("Total Floor Assignments", total_floors_after,
                         delta=f"{total_floors_after - total_floors_before:+d}")
-            col3.metric("Units Consolidated",
-                        sum(1 for r in result.before_after if r["Floor Change"] < 0))
+            col3.metric("Units Consolidated", units_consolidated)
 
         # --- Cost Estimation Panel ---
         st.subheader("Cost Estimation")
@@ -310,14 +378,16 @@ def render(sidebar_state):
 
             # Per-unit cost table
             with st.expander("Per-Unit Cost Breakdown", expanded=False):
-                cost_rows = []
-                for u, seats in sorted(result.unit_allocations.items()):
-                    cost_rows.append({
-                        "Unit": u,
-                        "Optimized Seats": seats,
-                        "Annual Cost": f"${seats * cost_per_seat:,.0f}",
-                    })
-                st.dataframe(pd.DataFrame(cost_rows), use_container_width=True, hide_index=True)
+                ua = result.unit_allocations
+                unit_keys = sorted(ua)
+                seats_arr = np.fromiter((ua[k] for k in unit_keys), dtype=np.int64, count=len(unit_keys))
+                cost_df = pd.DataFrame({
+                    "Unit": unit_keys,
+                    "Optimized Seats": seats_arr,
+                    "Annual Cost": seats_arr * cost_per_seat,
+                })
+                st.dataframe(cost_df.style.format({"Annual Cost": "${:,.0f}"}),
+                             use_container_width=True, hide_index=True)
 
         # Consolidation suggestions
         if result.consolidation_suggestions:
@@ -329,17 +399,11 @@ def render(sidebar_state):
         history = st.session_state.get("optimization_history", [])
         if len(history) > 1:
             st.subheader("Optimization History (Last 3 Runs)")
-            hist_rows = [
-                {
-                    "Time": h["timestamp"],
-                    "Objective": h["objective"],
-                    "Total Seats": h["total_seats"],
-                    "Floors Used": h["floors_used"],
-                    "Status": h["status"],
-                }
+            hist_df = _history_df(tuple(
+                (h["timestamp"], h["objective"], h["total_seats"], h["floors_used"], h["status"])
                 for h in history
-            ]
-            st.dataframe(pd.DataFrame(hist_rows), use_container_width=True, hide_index=True)
+            ))
+            st.dataframe(hist_df, use_container_width=True, hide_index=True)
 
         # Accept button
         st.divider()
@@ -358,7 +422,7 @@ def render(sidebar_state):
                 )
                 st.success("Optimization results applied to scenario.")
                 st.info("Dashboard, Spatial View, and Unit Impact now reflect the optimized allocation.")
-                st.session_state.pop("optimization_result", None)
+                opt_results.pop(opt_key, None)
                 st.rerun()
         else:
             st.warning("Cannot apply — scenario is locked.")
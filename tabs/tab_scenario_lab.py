@@ -2,16 +2,18 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import copy
 
 from data.session_store import (
-    get_active_scenario, get_scenarios, get_units, get_attendance, get_floors,
+    get_active_scenario, get_scenarios, get_units, get_floors,
     get_rule_config, update_scenario, add_audit_entry, is_data_loaded,
-    get_active_scenario_id, get_last_data_edit,
+    get_active_scenario_id, get_attendance_index, get_unit_index, get_data_version, get_floor_ids,
+    get_scenario_rto,
 )
 from models.scenario import ScenarioOverride, ScenarioParams
-from engine.scenario_engine import run_scenario, compare_scenarios, apply_overrides
-from engine.allocation_engine import compute_rto_alerts
+from engine.scenario_engine import run_scenario, compare_scenarios
+from engine.allocation_engine import compute_rto_compliance
 from components.tables import render_comparison_table
 from components.charts import scenario_comparison_bar
 from config.defaults import (
@@ -20,6 +22,112 @@ from config.defaults import (
 )
 
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_edit_rows(data_version, scenario_id, alloc_mode, _units, _att_map, _overrides) -> pd.DataFrame:
+    """Editable per-unit override table, pre-filled with scenario values over the baseline."""
+    rows = []
+    for u in _units:
+        att = _att_map.get(u.unit_name)
+        ov = _overrides.get(u.unit_name)
+
+        row = {
+            "Unit": u.unit_name,
+            "Growth %": ((ov and ov.hc_growth_pct) or u.hc_growth_pct) * 100,
+            "Attrition %": ((ov and ov.attrition_pct) or u.attrition_pct) * 100,
+        }
+
+        if alloc_mode == "advanced":
+            row["RTO Days"] = (ov and ov.avg_rto_days) or (att.avg_rto_days_per_week if att else 3.0)
+
+        row["Alloc % Override"] = ((ov and ov.alloc_pct_override) or 0) * 100
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _rto_compliance_map(data_version, mandate, _att_map) -> dict:
+    """unit_name -> RTO compliance against the scenario's mandate (empty without one)."""
+    if not (mandate and mandate > 0):
+        return {}
+    return {rc["unit_name"]: rc for rc in compute_rto_compliance(_att_map, mandate)}
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _baseline_diffs(data_version, base_id, base_run_at, base_name,
+                    scenario_id, scenario_run_at, scenario_name,
+                    _baseline, _scenario) -> tuple:
+    """Per-unit diff rows (and their DataFrame) between the baseline and a scenario run."""
+    diffs = compare_scenarios(_baseline, _scenario)
+    return diffs, pd.DataFrame(diffs)
+
+
+def _extract_overrides(edited: pd.DataFrame, unit_by_name: dict, att_map: dict, alloc_mode: str) -> dict:
+    """unit_name -> ScenarioOverride for edited rows that differ from the baseline.
+
+    Changes are detected with column-wise array comparisons (tolerance 0.01);
+    only the changed rows are turned into override objects.
+    """
+    names = edited["Unit"].tolist()
+    base_units = [unit_by_name.get(n) for n in names]
+    known = np.array([u is not None for u in base_units], dtype=bool)
+
+    growth = edited["Growth %"].to_numpy(dtype=float)
+    attrition = edited["Attrition %"].to_numpy(dtype=float)
+    alloc_pct = edited["Alloc % Override"].to_numpy(dtype=float)
+    base_growth = np.array([u.hc_growth_pct * 100 if u else np.nan for u in base_units], dtype=float)
+    base_attrition = np.array([u.attrition_pct * 100 if u else np.nan for u in base_units], dtype=float)
+
+    growth_mask = np.abs(growth - base_growth) > 0.01
+    attrition_mask = np.abs(attrition - base_attrition) > 0.01
+    alloc_mask = alloc_pct > 0
+    if alloc_mode == "advanced" and "RTO Days" in edited.columns:
+        rto = edited["RTO Days"].to_numpy(dtype=float)
+        base_rto = np.array([
+            att_map[n].avg_rto_days_per_week if n in att_map else 3.0 for n in names
+        ], dtype=float)
+        rto_mask = np.abs(rto - base_rto) > 0.01
+    else:
+        rto = None
+        rto_mask = np.zeros(len(names), dtype=bool)
+
+    overrides = {}
+    changed_idx = np.flatnonzero(known & (growth_mask | attrition_mask | rto_mask | alloc_mask))
+    for i in changed_idx.tolist():
+        override = ScenarioOverride(unit_name=names[i])
+        if growth_mask[i]:
+            override.hc_growth_pct = float(growth[i]) / 100.0
+        if attrition_mask[i]:
+            override.attrition_pct = float(attrition[i]) / 100.0
+        if rto_mask[i]:
+            override.avg_rto_days = float(rto[i])
+        if alloc_mask[i]:
+            override.alloc_pct_override = float(alloc_pct[i]) / 100.0
+        overrides[names[i]] = override
+    return overrides
+
+
+def _sync_controls(scenario) -> None:
+    """Load the scenario-wide control widgets from ``scenario.params``.
+
+    The controls are keyed widgets, so Streamlit keeps their last value across
+    reruns and ignores defaults after the first render. Reload them whenever the
+    active scenario or its stored parameters change (switch, run, reset), or when
+    their state was dropped, so one scenario's settings never carry over to another.
+    """
+    params = scenario.params
+    snapshot = (
+        scenario.scenario_id, params.global_rto_mandate_days,
+        params.capacity_reduction_pct, tuple(params.excluded_floors),
+    )
+    if (st.session_state.get("_scenario_controls_for") != snapshot
+            or "scenario_rto_mandate" not in st.session_state):
+        st.session_state["_scenario_controls_for"] = snapshot
+        st.session_state["scenario_rto_mandate"] = float(params.global_rto_mandate_days or 0.0)
+        st.session_state["scenario_capacity_reduction"] = round(params.capacity_reduction_pct * 100)
+        st.session_state["scenario_excluded_floors"] = list(params.excluded_floors)
+
+
 def render(sidebar_state):
     """Render the Scenario Lab tab."""
     st.header("Scenario Lab")
@@ -39,8 +147,7 @@ def render(sidebar_state):
         st.warning(f"Scenario '{scenario.name}' is locked. Changes are disabled.")
 
     # Stale-data warning
-    last_edit = get_last_data_edit()
-    if last_edit and (scenario.last_run_at is None or last_edit > scenario.last_run_at):
+    if scenario.is_stale:
         st.warning(
             "Base data has changed since the last simulation. "
             "Re-run the simulation to see updated results."
@@ -54,13 +161,13 @@ def render(sidebar_state):
 
     # --- Scenario-Wide Controls ---
     st.subheader("Scenario-Wide Controls")
+    _sync_controls(scenario)
 
     col1, col2, col3 = st.columns(3)
     with col1:
         rto_mandate = st.slider(
             "Global RTO Mandate (days/week)",
             min_value=0.0, max_value=5.0,
-            value=scenario.params.global_rto_mandate_days or 0.0,
             step=0.5,
             key="scenario_rto_mandate",
             disabled=scenario.is_locked,
@@ -69,7 +176,6 @@ def render(sidebar_state):
         capacity_reduction_int = st.slider(
             "Capacity Reduction %",
             min_value=0, max_value=30,
-            value=round(scenario.params.capacity_reduction_pct * 100),
             step=5,
             key="scenario_capacity_reduction",
             disabled=scenario.is_locked,
@@ -77,11 +183,10 @@ def render(sidebar_state):
         capacity_reduction = capacity_reduction_int / 100.0
     with col3:
         floors = get_floors()
-        all_floor_ids = sorted(set(f.floor_id for f in floors))
+        all_floor_ids = get_floor_ids()
         excluded = st.multiselect(
             "Excluded Floors",
             all_floor_ids,
-            default=scenario.params.excluded_floors,
             key="scenario_excluded_floors",
             disabled=scenario.is_locked,
         )
@@ -95,8 +200,8 @@ def render(sidebar_state):
     alloc_mode = rule_config.get("allocation_mode", "simple")
 
     units = get_units()
-    attendance_profiles = get_attendance()
-    att_map = {a.unit_name: a for a in attendance_profiles}
+    unit_by_name = get_unit_index()
+    att_map = get_attendance_index()
 
     if alloc_mode == "simple":
         st.caption(
@@ -104,32 +209,186 @@ def render(sidebar_state):
             "RTO days are not used for allocation in this mode."
         )
 
-    # Build editable dataframe — scenario values only (pre-filled from baseline)
-    rows = []
-    for u in units:
-        att = att_map.get(u.unit_name)
-        override = scenario.unit_overrides.get(u.unit_name, ScenarioOverride(unit_name=u.unit_name))
+    _override_editor(
+        scenario, units, unit_by_name, att_map, floors, alloc_mode,
+        rto_mandate, excluded, capacity_reduction,
+    )
 
-        row = {
-            "Unit": u.unit_name,
-            "Growth %": (override.hc_growth_pct or u.hc_growth_pct) * 100,
-            "Attrition %": (override.attrition_pct or u.attrition_pct) * 100,
-        }
+    # Scenario-wide controls moved since the last run: the stored results no longer
+    # match them, so skip building the results sections until the user re-runs.
+    # Locked scenarios cannot be re-run, so their results are always shown.
+    controls_changed = not scenario.is_locked and (
+        (rto_mandate if rto_mandate > 0 else None) != scenario.params.global_rto_mandate_days
+        or capacity_reduction_int != round(scenario.params.capacity_reduction_pct * 100)
+        or set(excluded) != set(scenario.params.excluded_floors)
+    )
 
-        if alloc_mode == "advanced":
-            row["RTO Days"] = override.avg_rto_days or (att.avg_rto_days_per_week if att else 3.0)
+    # --- Current Results Summary ---
+    if scenario.allocation_results and controls_changed:
+        st.divider()
+        st.subheader("Current Scenario Results")
+        st.info("Parameters changed — click Run Simulation to refresh results.")
+    elif scenario.allocation_results:
+        st.divider()
+        st.subheader("Current Scenario Results")
 
-        row["Alloc % Override"] = (override.alloc_pct_override or 0) * 100
-        rows.append(row)
+        allocs = scenario.allocation_results
+
+        # RTO data for table enrichment (rebuilt only when the scenario or base data change)
+        has_rto_mandate = (
+            scenario.params.global_rto_mandate_days
+            and scenario.params.global_rto_mandate_days > 0
+        )
+        _, _, rto_alert_map = get_scenario_rto(scenario)
+        rto_compliance_map = _rto_compliance_map(
+            get_data_version(), scenario.params.global_rto_mandate_days, att_map,
+        )
+
+        # Build enriched table column-wise
+        n = len(allocs)
+        names = [a.unit_name for a in allocs]
+        demand = np.fromiter((a.effective_demand_seats for a in allocs), dtype=np.int64, count=n)
+        allocated = np.fromiter((a.allocated_seats for a in allocs), dtype=np.int64, count=n)
+        seat_gap = np.fromiter((a.seat_gap for a in allocs), dtype=np.int64, count=n)
+        rto_need = []
+        rto_status = []
+        for name in names:
+            ra = rto_alert_map.get(name)
+            rto_need.append(ra["expected_seats"] if ra else "—")
+            rc = rto_compliance_map.get(name) if has_rto_mandate else None
+            if rc:
+                mark = "✓" if rc["compliant"] else "✗"
+                rto_status.append(f"{rc['actual_rto']:.1f} / {rc['target_rto']:.1f} {mark}")
+            else:
+                rto_status.append("N/A")
+
+        result_df = pd.DataFrame({
+            "Unit": names,
+            "Alloc %": [f"{a.recommended_alloc_pct:.1%}" for a in allocs],
+            "Demand": demand,
+            "Allocated": allocated,
+            "Gap": seat_gap,
+            "RTO Need": rto_need,
+            "RTO Status": rto_status,
+            "Fragmentation": [f"{a.fragmentation_score:.2f}" for a in allocs],
+            "Overridden": ["Yes" if a.is_overridden else "" for a in allocs],
+        })
+        st.dataframe(result_df, use_container_width=True)
+
+        # --- Scenario Impact Summary (English narrative) ---
+        st.divider()
+        st.subheader("Scenario Impact Summary")
+        # Narrative, highlights and risk scan are only built once the user asks for them
+        show_summary = st.toggle("Show impact summary", key="scenario_show_summary")
+        if show_summary:
+            frag = np.fromiter((a.fragmentation_score for a in allocs), dtype=np.float64, count=n)
+            total_demand = int(demand.sum())
+            total_allocated = int(allocated.sum())
+
+            priorities = {name: (u.business_priority or "—") for name, u in unit_by_name.items()}
+            highlights = []
+            for a in allocs:
+                gap_label = f"{a.seat_gap:+d} seat {'shortfall' if a.seat_gap < 0 else 'surplus'}"
+                highlights.append(
+                    f"**{a.unit_name}**: {a.recommended_alloc_pct:.1%} allocation "
+                    f"-> {a.effective_demand_seats} needed, {a.allocated_seats} allocated "
+                    f"({gap_label}, {priorities.get(a.unit_name, '—')} priority)"
+                )
+
+            # RED/AMBER classification as array masks
+            gap_pct = np.divide(seat_gap, demand, out=np.zeros(n), where=demand > 0)
+            red = (gap_pct < RISK_RED_GAP_PCT) | (frag > RISK_RED_FRAGMENTATION)
+            amber = ~red & ((gap_pct < RISK_AMBER_GAP_PCT) | (frag > RISK_AMBER_FRAGMENTATION))
+            risk_units = [
+                (allocs[i].unit_name, "RED" if red[i] else "AMBER", float(gap_pct[i]), float(frag[i]))
+                for i in np.flatnonzero(red | amber)
+            ]
+
+            total_gap = total_allocated - total_demand
+            num_units = len(allocs)
+
+            st.markdown(
+                f"This scenario allocates **{total_allocated:,} seats** across "
+                f"**{num_units} units**. Total demand is **{total_demand:,} seats**, "
+                f"leaving a net gap of **{total_gap:+,} seats**."
+            )
+
+            # RTO Need explanation
+            total_rto_need = sum(
+                rto_alert_map[a.unit_name]["expected_seats"]
+                for a in allocs if a.unit_name in rto_alert_map
+            )
+            st.markdown(
+                f"**RTO Need** reflects how many seats each unit actually requires based on "
+                f"real attendance patterns: *(Median HC + Peak Buffer) x (RTO Days / 5)*. "
+                f"Total RTO-based need across all units is **{total_rto_need:,} seats** "
+                f"vs **{total_allocated:,} allocated**."
+            )
+
+            # Per-unit highlights
+            with st.expander("Per-Unit Details", expanded=False):
+                st.markdown("\n".join(f"- {h}" for h in highlights))
+
+            # Key risks (RED/AMBER units)
+            if risk_units:
+                risk_lines = ["**Key Risks:**", ""]
+                for name, level, gp, frag_score in risk_units:
+                    reason_parts = []
+                    if gp < RISK_AMBER_GAP_PCT:
+                        reason_parts.append(f"seat shortfall {gp:.0%}")
+                    if frag_score > RISK_AMBER_FRAGMENTATION:
+                        reason_parts.append(f"high fragmentation {frag_score:.2f}")
+                    reason = ", ".join(reason_parts)
+                    risk_lines.append(f"- :{'red' if level == 'RED' else 'orange'}[{level}] **{name}** — {reason}")
+                st.markdown("\n".join(risk_lines))
+
+        # --- Auto Baseline Comparison ---
+        if scenario.scenario_id != "baseline":
+            baseline = scenarios.get("baseline")
+            if baseline and baseline.allocation_results:
+                st.divider()
+                st.subheader(f"Changes vs Baseline")
+
+                diffs, diff_df = _baseline_diffs(
+                    get_data_version(), baseline.scenario_id, baseline.last_run_at, baseline.name,
+                    scenario.scenario_id, scenario.last_run_at, scenario.name,
+                    baseline, scenario,
+                )
+
+                # Text summary
+                gained = sum(1 for d in diffs if d["Seat Change"] > 0)
+                lost = sum(1 for d in diffs if d["Seat Change"] < 0)
+                net_change = sum(d["Seat Change"] for d in diffs)
+                st.markdown(
+                    f"Compared to baseline: **{gained} units gained seats**, "
+                    f"**{lost} units lost seats**. "
+                    f"Net change: **{net_change:+,} seats**."
+                )
 
-    edit_df = pd.DataFrame(rows)
+                render_comparison_table(diff_df)
+                fig = scenario_comparison_bar(diff_df)
+                st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def _override_editor(scenario, units, unit_by_name, att_map, floors, alloc_mode,
+                     rto_mandate, excluded, capacity_reduction):
+    """Unit-level override table and action buttons.
+
+    Runs as a fragment so cell edits rerun only this section; running or
+    resetting the simulation triggers a full app rerun.
+    """
+    # Build editable dataframe — scenario values only (pre-filled from baseline)
+    edit_df = _build_edit_rows(
+        get_data_version(), scenario.scenario_id, alloc_mode, units, att_map, scenario.unit_overrides,
+    )
 
     if not scenario.is_locked:
         edited = st.data_editor(
             edit_df,
             disabled=["Unit"],
             use_container_width=True,
-            key="scenario_unit_editor",
+            key=f"scenario_unit_editor_{scenario.scenario_id}",
             num_rows="fixed",
         )
     else:
@@ -159,34 +418,7 @@ def render(sidebar_state):
 
     if run_sim and not scenario.is_locked:
         # Extract overrides from edited table
-        overrides = {}
-        for _, row in edited.iterrows():
-            unit_name = row["Unit"]
-            base_unit = next((u for u in units if u.unit_name == unit_name), None)
-            if not base_unit:
-                continue
-
-            override = ScenarioOverride(unit_name=unit_name)
-            has_change = False
-
-            if abs(row["Growth %"] - base_unit.hc_growth_pct * 100) > 0.01:
-                override.hc_growth_pct = row["Growth %"] / 100.0
-                has_change = True
-            if abs(row["Attrition %"] - base_unit.attrition_pct * 100) > 0.01:
-                override.attrition_pct = row["Attrition %"] / 100.0
-                has_change = True
-            if alloc_mode == "advanced" and "RTO Days" in row:
-                att = att_map.get(unit_name)
-                base_rto = att.avg_rto_days_per_week if att else 3.0
-                if abs(row["RTO Days"] - base_rto) > 0.01:
-                    override.avg_rto_days = row["RTO Days"]
-                    has_change = True
-            if row["Alloc % Override"] > 0:
-                override.alloc_pct_override = row["Alloc % Override"] / 100.0
-                has_change = True
-
-            if has_change:
-                overrides[unit_name] = override
+        overrides = _extract_overrides(edited, unit_by_name, att_map, alloc_mode)
 
         # Update scenario params
         scenario.unit_overrides = overrides
@@ -197,9 +429,8 @@ def render(sidebar_state):
         )
 
         # Run simulation
-        att_map_full = {a.unit_name: a for a in attendance_profiles}
         scenario = run_scenario(
-            scenario, units, att_map_full, floors, get_rule_config(),
+            scenario, units, att_map, floors, get_rule_config(),
         )
         update_scenario(scenario)
         add_audit_entry(
@@ -218,145 +449,3 @@ def render(sidebar_state):
         add_audit_entry("reset", scenario.scenario_id, "all", "", "reset")
         st.success("Scenario reset to defaults.")
         st.rerun()
-
-    # --- Current Results Summary ---
-    if scenario.allocation_results:
-        st.divider()
-        st.subheader("Current Scenario Results")
-
-        allocs = scenario.allocation_results
-
-        # Compute RTO data for table enrichment
-        att_profiles = get_attendance()
-        att_map_rto = {a.unit_name: a for a in att_profiles}
-        _, scenario_att_map = apply_overrides(units, att_map_rto, scenario)
-        rto_alerts_data = compute_rto_alerts(allocs, units, scenario_att_map, get_rule_config())
-        rto_alert_map = {ra["unit_name"]: ra for ra in rto_alerts_data}
-
-        # RTO compliance lookup
-        has_rto_mandate = (
-            scenario.params.global_rto_mandate_days
-            and scenario.params.global_rto_mandate_days > 0
-        )
-        rto_compliance_map = {}
-        if has_rto_mandate:
-            from engine.allocation_engine import compute_rto_compliance
-            compliance = compute_rto_compliance(att_map_rto, scenario.params.global_rto_mandate_days)
-            rto_compliance_map = {rc["unit_name"]: rc for rc in compliance}
-
-        # Build enriched table
-        result_rows = []
-        for a in allocs:
-            ra = rto_alert_map.get(a.unit_name)
-            rc = rto_compliance_map.get(a.unit_name)
-
-            rto_need = ra["expected_seats"] if ra else "—"
-
-            if has_rto_mandate and rc:
-                if rc["compliant"]:
-                    rto_status = f"{rc['actual_rto']:.1f} / {rc['target_rto']:.1f} ✓"
-                else:
-                    rto_status = f"{rc['actual_rto']:.1f} / {rc['target_rto']:.1f} ✗"
-            else:
-                rto_status = "N/A"
-
-            result_rows.append({
-                "Unit": a.unit_name,
-                "Alloc %": f"{a.recommended_alloc_pct:.1%}",
-                "Demand": a.effective_demand_seats,
-                "Allocated": a.allocated_seats,
-                "Gap": a.seat_gap,
-                "RTO Need": rto_need,
-                "RTO Status": rto_status,
-                "Fragmentation": f"{a.fragmentation_score:.2f}",
-                "Overridden": "Yes" if a.is_overridden else "",
-            })
-
-        st.dataframe(pd.DataFrame(result_rows), use_container_width=True)
-
-        # --- Scenario Impact Summary (English narrative) ---
-        st.divider()
-        st.subheader("Scenario Impact Summary")
-
-        total_demand = sum(a.effective_demand_seats for a in allocs)
-        total_allocated = sum(a.allocated_seats for a in allocs)
-        total_gap = total_allocated - total_demand
-        num_units = len(allocs)
-
-        st.markdown(
-            f"This scenario allocates **{total_allocated:,} seats** across "
-            f"**{num_units} units**. Total demand is **{total_demand:,} seats**, "
-            f"leaving a net gap of **{total_gap:+,} seats**."
-        )
-
-        # RTO Need explanation
-        total_rto_need = sum(
-            rto_alert_map[a.unit_name]["expected_seats"]
-            for a in allocs if a.unit_name in rto_alert_map
-        )
-        st.markdown(
-            f"**RTO Need** reflects how many seats each unit actually requires based on "
-            f"real attendance patterns: *(Median HC + Peak Buffer) x (RTO Days / 5)*. "
-            f"Total RTO-based need across all units is **{total_rto_need:,} seats** "
-            f"vs **{total_allocated:,} allocated**."
-        )
-
-        # Per-unit highlights
-        unit_map_summary = {u.unit_name: u for u in units}
-        highlights = []
-        for a in allocs:
-            u = unit_map_summary.get(a.unit_name)
-            priority = (u.business_priority or "—") if u else "—"
-            gap_label = f"{a.seat_gap:+d} seat {'shortfall' if a.seat_gap < 0 else 'surplus'}"
-            highlights.append(
-                f"**{a.unit_name}**: {a.recommended_alloc_pct:.1%} allocation "
-                f"-> {a.effective_demand_seats} needed, {a.allocated_seats} allocated "
-                f"({gap_label}, {priority} priority)"
-            )
-        with st.expander("Per-Unit Details", expanded=False):
-            for h in highlights:
-                st.markdown(f"- {h}")
-
-        # Key risks (RED/AMBER units)
-        risk_units = []
-        for a in allocs:
-            gap_pct = a.seat_gap / a.effective_demand_seats if a.effective_demand_seats > 0 else 0
-            if gap_pct < RISK_RED_GAP_PCT or a.fragmentation_score > RISK_RED_FRAGMENTATION:
-                risk_units.append((a.unit_name, "RED", gap_pct, a.fragmentation_score))
-            elif gap_pct < RISK_AMBER_GAP_PCT or a.fragmentation_score > RISK_AMBER_FRAGMENTATION:
-                risk_units.append((a.unit_name, "AMBER", gap_pct, a.fragmentation_score))
-
-        if risk_units:
-            st.markdown("**Key Risks:**")
-            for name, level, gp, frag in risk_units:
-                reason_parts = []
-                if gp < RISK_AMBER_GAP_PCT:
-                    reason_parts.append(f"seat shortfall {gp:.0%}")
-                if frag > RISK_AMBER_FRAGMENTATION:
-                    reason_parts.append(f"high fragmentation {frag:.2f}")
-                reason = ", ".join(reason_parts)
-                st.markdown(f"- :{'red' if level == 'RED' else 'orange'}[{level}] **{name}** — {reason}")
-
-        # --- Auto Baseline Comparison ---
-        if scenario.scenario_id != "baseline":
-            baseline = scenarios.get("baseline")
-            if baseline and baseline.allocation_results:
-                st.divider()
-                st.subheader(f"Changes vs Baseline")
-
-                diffs = compare_scenarios(baseline, scenario)
-                diff_df = pd.DataFrame(diffs)
-
-                # Text summary
-                gained = sum(1 for d in diffs if d["Seat Change"] > 0)
-                lost = sum(1 for d in diffs if d["Seat Change"] < 0)
-                net_change = sum(d["Seat Change"] for d in diffs)
-                st.markdown(
-                    f"Compared to baseline: **{gained} units gained seats**, "
-                    f"**{lost} units lost seats**. "
-                    f"Net change: **{net_change:+,} seats**."
-                )
-
-                render_comparison_table(diff_df)
-                fig = scenario_comparison_bar(diff_df)
-                st.plotly_chart(fig, use_container_width=True)
@@ -2,13 +2,90 @@
 
 import streamlit as st
 import pandas as pd
+from collections import Counter
 
-from data.session_store import get_active_scenario, get_floors, is_data_loaded
-from engine.spatial import get_floor_utilization, get_consolidation_suggestions
+from data.session_store import (
+    get_active_scenario, get_floors, is_data_loaded, get_data_version, get_floor_ids,
+    get_scenario_floor_util,
+)
+from engine.spatial import get_consolidation_suggestions
 from components.charts import floor_heatmap, unit_floor_heatmap
 from config.defaults import FLOOR_SATURATION_THRESHOLD, FLOOR_SURPLUS_THRESHOLD
 
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def _util_df(data_version, scenario_id, last_run_at, _floor_util) -> pd.DataFrame:
+    """Full (unfiltered) floor utilization of one scenario run as a DataFrame.
+
+    Tower filtering happens downstream.
+    """
+    return pd.DataFrame(
+        _floor_util, columns=["tower_id", "total_seats", "used_seats", "utilization_pct"],
+    )
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _tower_ids(data_version, _floors) -> list:
+    """Sorted unique tower ids."""
+    return sorted({f.tower_id for f in _floors})
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _unit_names(data_version, scenario_id, last_run_at, _assignments) -> list:
+    """Sorted names of units with at least one floor assignment."""
+    return sorted({a.unit_name for a in _assignments})
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _floor_heatmap_fig(data_version, scenario_id, last_run_at, tower_filter, _floor_util):
+    """Floor utilization heatmap for one scenario run and tower filter."""
+    return floor_heatmap(_floor_util, tower_filter)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _unit_floor_fig(data_version, scenario_id, last_run_at, tower_filter,
+                    _assignments, _floor_ids, _unit_names):
+    """Unit x floor heatmap for one scenario run and tower filter, or None if there is nothing to plot."""
+    assignment_dicts = [{
+        "tower_id": a.tower_id,
+        "floor_number": a.floor_number,
+        "unit_name": a.unit_name,
+        "seats_assigned": a.seats_assigned,
+    } for a in _assignments if not tower_filter or a.tower_id == tower_filter]
+
+    floor_ids = _floor_ids
+    if tower_filter:
+        floor_ids = [fid for fid in floor_ids if fid.startswith(tower_filter)]
+
+    if not (assignment_dicts and floor_ids and _unit_names):
+        return None
+    return unit_floor_heatmap(assignment_dicts, floor_ids, _unit_names)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _floor_detail_df(data_version, scenario_id, last_run_at, tower_filter, _floor_util) -> pd.DataFrame:
+    """Per-floor detail table for one scenario run and tower filter."""
+    rows = [fu for fu in _floor_util if not tower_filter or fu["tower_id"] == tower_filter]
+    if not rows:
+        return pd.DataFrame()
+
+    def col(key):
+        return [fu[key] for fu in rows]
+
+    return pd.DataFrame({
+        "Floor": col("floor_id"),
+        "Building": col("building_name"),
+        "Tower": col("tower_id"),
+        "Floor #": col("floor_number"),
+        "Total Seats": col("total_seats"),
+        "Used": col("used_seats"),
+        "Available": col("available_seats"),
+        "Utilization": [f"{fu['utilization_pct']:.0%}" for fu in rows],
+        "# Units": col("unit_count"),
+        "Units (seats)": col("units_str"),
+    })
+
+
 def render(sidebar_state):
     """Render the Spatial / Floor View tab."""
     st.header("Spatial / Floor View")
@@ -27,10 +104,11 @@ def render(sidebar_state):
     allocations = scenario.allocation_results
 
     # Floor utilization data
-    floor_util = get_floor_utilization(floors, assignments)
+    floor_util = get_scenario_floor_util(scenario)
+    util_df = _util_df(get_data_version(), scenario.scenario_id, scenario.last_run_at, floor_util)
 
     # --- Tower Selector ---
-    towers = sorted(set(f.tower_id for f in floors))
+    towers = _tower_ids(get_data_version(), floors)
     selected_tower = st.selectbox("Filter by Tower", ["All"] + towers, key="spatial_tower")
 
     tower_filter = selected_tower if selected_tower != "All" else None
@@ -39,24 +117,24 @@ def render(sidebar_state):
     col1, col2 = st.columns([3, 2])
 
     with col1:
-        fig = floor_heatmap(floor_util, tower_filter)
+        fig = _floor_heatmap_fig(
+            get_data_version(), scenario.scenario_id, scenario.last_run_at, tower_filter, floor_util,
+        )
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         # Summary stats
-        filtered_util = floor_util
-        if tower_filter:
-            filtered_util = [f for f in floor_util if f["tower_id"] == tower_filter]
+        subset = util_df if tower_filter is None else util_df[util_df["tower_id"] == tower_filter]
 
-        total = sum(f["total_seats"] for f in filtered_util)
-        used = sum(f["used_seats"] for f in filtered_util)
+        total = int(subset["total_seats"].sum())
+        used = int(subset["used_seats"].sum())
 
         st.metric("Total Seats", f"{total:,}")
         st.metric("Used Seats", f"{used:,}")
         st.metric("Utilization", f"{used/total:.1%}" if total > 0 else "N/A")
 
-        saturated = sum(1 for f in filtered_util if f["utilization_pct"] > FLOOR_SATURATION_THRESHOLD)
-        surplus = sum(1 for f in filtered_util if f["utilization_pct"] < FLOOR_SURPLUS_THRESHOLD)
+        saturated = int((subset["utilization_pct"] > FLOOR_SATURATION_THRESHOLD).sum())
+        surplus = int((subset["utilization_pct"] < FLOOR_SURPLUS_THRESHOLD).sum())
         st.metric("Saturated Floors (>90%)", saturated)
         st.metric("Surplus Floors (<80%)", surplus)
 
@@ -65,60 +143,43 @@ def render(sidebar_state):
     # --- Unit x Floor Heatmap ---
     st.subheader("Unit Distribution by Floor")
 
-    # Prepare assignment data for heatmap
-    assignment_dicts = [{
-        "tower_id": a.tower_id,
-        "floor_number": a.floor_number,
-        "unit_name": a.unit_name,
-        "seats_assigned": a.seats_assigned,
-    } for a in assignments]
-
-    floor_ids = sorted(set(f.floor_id for f in floors))
-    unit_names = sorted(set(a.unit_name for a in assignments))
-
-    if tower_filter:
-        floor_ids = [fid for fid in floor_ids if fid.startswith(tower_filter)]
-        assignment_dicts = [a for a in assignment_dicts if a["tower_id"] == tower_filter]
-
-    if assignment_dicts and floor_ids and unit_names:
-        fig = unit_floor_heatmap(assignment_dicts, floor_ids, unit_names)
+    floor_ids = get_floor_ids()
+    unit_names = _unit_names(get_data_version(), scenario.scenario_id, scenario.last_run_at, assignments)
+    fig = _unit_floor_fig(
+        get_data_version(), scenario.scenario_id, scenario.last_run_at, tower_filter,
+        assignments, floor_ids, unit_names,
+    )
+    if fig is not None:
         st.plotly_chart(fig, use_container_width=True)
 
     st.divider()
 
     # --- Floor Detail Table ---
     st.subheader("Floor Detail")
-    detail_rows = []
-    for fu in floor_util:
-        if tower_filter and fu["tower_id"] != tower_filter:
-            continue
-        units_str = ", ".join(f"{u}: {s}" for u, s in fu["units"].items()) if fu["units"] else "—"
-        detail_rows.append({
-            "Floor": fu["floor_id"],
-            "Building": fu["building_name"],
-            "Tower": fu["tower_id"],
-            "Floor #": fu["floor_number"],
-            "Total Seats": fu["total_seats"],
-            "Used": fu["used_seats"],
-            "Available": fu["available_seats"],
-            "Utilization": f"{fu['utilization_pct']:.0%}",
-            "# Units": fu["unit_count"],
-            "Units (seats)": units_str,
-        })
-
-    if detail_rows:
-        st.dataframe(pd.DataFrame(detail_rows), use_container_width=True, height=400)
+    # The per-floor table is only built once the user asks for it
+    if st.toggle("Show floor detail", key="spatial_show_detail"):
+        detail_df = _floor_detail_df(
+            get_data_version(), scenario.scenario_id, scenario.last_run_at, tower_filter, floor_util,
+        )
+        if not detail_df.empty:
+            st.dataframe(detail_df, use_container_width=True, height=400)
 
     st.divider()
 
     # --- Cross-Building Spread ---
     st.subheader("Building Spread")
-    from collections import defaultdict
-    unit_bldg_spread = defaultdict(lambda: defaultdict(int))
+    unit_bldgs = {}
     for a in assignments:
-        unit_bldg_spread[a.unit_name][a.building_id] += 1
-
-    cross_bldg_units = {u: b for u, b in unit_bldg_spread.items() if len(b) > 1}
+        unit_bldgs.setdefault(a.unit_name, set()).add(a.building_id)
+
+    # Floor counts per building are only needed for units that span buildings
+    cross_names = {u for u, b in unit_bldgs.items() if len(b) > 1}
+    floor_counts = Counter(
+        (a.unit_name, a.building_id) for a in assignments if a.unit_name in cross_names
+    )
+    cross_bldg_units = {
+        u: {bid: floor_counts[(u, bid)] for bid in unit_bldgs[u]} for u in cross_names
+    }
     if cross_bldg_units:
         for unit_name, bldgs in sorted(cross_bldg_units.items()):
             detail = ", ".join(f"{bid} ({cnt} floor{'s' if cnt > 1 else ''})"
@@ -1,16 +1,21 @@
 """Tab 2: Unit Impact View — transparency and accountability at unit level."""
 
+import csv
+import io
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 
-from data.session_store import get_active_scenario, get_units, get_attendance, get_rule_config, is_data_loaded
+from data.session_store import (
+    get_active_scenario, get_units, get_unit_index,
+    get_rule_config, is_data_loaded, get_data_version, get_scenario_rto,
+)
 from components.tables import render_risk_table
-from engine.allocation_engine import compute_rto_alerts
-from engine.scenario_engine import apply_overrides
 from collections import defaultdict
 from config.defaults import (
     RISK_RED_GAP_PCT, RISK_RED_FRAGMENTATION,
-    RISK_AMBER_GAP_PCT, RISK_AMBER_FRAGMENTATION,
+    RISK_AMBER_GAP_PCT, RISK_AMBER_FRAGMENTATION, UNIT_IMPACT_PAGE_SIZE,
 )
 
 ADJACENCY_LABELS = {
@@ -24,12 +29,110 @@ ADJACENCY_LABELS = {
 }
 
 
-def _compute_risk_level(gap_pct: float, fragmentation: float) -> str:
-    if gap_pct < RISK_RED_GAP_PCT or fragmentation > RISK_RED_FRAGMENTATION:
-        return "RED"
-    elif gap_pct < RISK_AMBER_GAP_PCT or fragmentation > RISK_AMBER_FRAGMENTATION:
-        return "AMBER"
-    return "GREEN"
+def _risk_levels(gap_pct: np.ndarray, fragmentation: np.ndarray) -> np.ndarray:
+    """RED/AMBER/GREEN per unit from gap % and fragmentation arrays."""
+    return np.select(
+        [
+            (gap_pct < RISK_RED_GAP_PCT) | (fragmentation > RISK_RED_FRAGMENTATION),
+            (gap_pct < RISK_AMBER_GAP_PCT) | (fragmentation > RISK_AMBER_FRAGMENTATION),
+        ],
+        ["RED", "AMBER"],
+        default="GREEN",
+    ).astype(object)
+
+
+def _fmt_pct(values) -> np.ndarray:
+    """Format fractions as one-decimal percent strings in a single vectorized pass."""
+    return np.char.mod("%.1f%%", np.asarray(values, dtype=np.float64) * 100)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _priority_options(data_version, _units) -> list:
+    """Sorted unique business priorities ("None" for unset)."""
+    return sorted({u.business_priority or "None" for u in _units})
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _unit_placements(data_version, scenario_id, last_run_at, _assignments) -> tuple:
+    """Building set and floor assignment list per unit, built in one pass over a scenario run."""
+    unit_buildings = defaultdict(set)
+    floors_by_unit = defaultdict(list)
+    for a in _assignments:
+        unit_buildings[a.unit_name].add(a.building_id)
+        floors_by_unit[a.unit_name].append(a)
+    return dict(unit_buildings), dict(floors_by_unit)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _impact_frame(data_version, scenario_id, last_run_at, rule_config, horizon,
+                  _allocations, _unit_map, _unit_buildings, _rto_alerts) -> pd.DataFrame:
+    """Unformatted per-unit impact columns for a scenario run, indexed by unit name.
+
+    Allocations whose unit is no longer in the unit list are skipped.
+    """
+    cols = {
+        "unit_name": [], "priority": [], "current_hc": [],
+        "hc_growth_pct": [], "attrition_pct": [], "alloc_pct": [], "overridden": [],
+        "demand": [], "allocated": [], "gap": [], "fragmentation": [],
+        "buildings": [], "rto_status": [],
+    }
+    for a in _allocations:
+        u = _unit_map.get(a.unit_name)
+        if not u:
+            continue
+        cols["unit_name"].append(a.unit_name)
+        cols["priority"].append(u.business_priority or "None")
+        cols["current_hc"].append(u.current_total_hc)
+        cols["hc_growth_pct"].append(u.hc_growth_pct)
+        cols["attrition_pct"].append(u.attrition_pct)
+        cols["alloc_pct"].append(a.recommended_alloc_pct)
+        cols["overridden"].append(a.is_overridden)
+        cols["demand"].append(a.effective_demand_seats)
+        cols["allocated"].append(a.allocated_seats)
+        cols["gap"].append(a.seat_gap)
+        cols["fragmentation"].append(a.fragmentation_score)
+        cols["buildings"].append(len(_unit_buildings.get(a.unit_name, ())))
+        ra = _rto_alerts.get(a.unit_name)
+        cols["rto_status"].append(ra["status"] if ra else "N/A")
+
+    names = pd.Index(cols.pop("unit_name"), name="unit_name", dtype=object)
+    frame = pd.DataFrame(cols, index=names)
+    frame["name_lc"] = [name.lower() for name in names]
+    # Same arithmetic as Unit.projected_hc, over the whole column
+    monthly_net = (frame["hc_growth_pct"].to_numpy(dtype=np.float64)
+                   - frame["attrition_pct"].to_numpy(dtype=np.float64)) / 12
+    projected = frame["current_hc"].to_numpy(dtype=np.float64) * (1 + monthly_net * horizon)
+    frame["projected_hc"] = np.round(projected).astype(np.int64)
+
+    demand = frame["demand"].to_numpy(dtype=np.float64)
+    gap = frame["gap"].to_numpy(dtype=np.float64)
+    frame["gap_pct"] = np.divide(gap, demand, out=np.zeros(len(frame)), where=demand > 0)
+    frame["risk"] = _risk_levels(frame["gap_pct"].to_numpy(), frame["fragmentation"].to_numpy(dtype=np.float64))
+    return frame
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _filtered_rows(data_version, scenario_id, last_run_at, rule_config, horizon,
+                   priorities, risks, search_lc, _frame) -> np.ndarray:
+    """Positions of impact-frame rows matching the priority, risk and search filters."""
+    mask = (
+        _frame["priority"].isin(frozenset(priorities)).to_numpy()
+        & _frame["risk"].isin(frozenset(risks)).to_numpy()
+    )
+    if search_lc:
+        mask &= np.fromiter((search_lc in name for name in _frame["name_lc"]), dtype=bool, count=len(_frame))
+    return np.flatnonzero(mask)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _impact_csv(data_version, scenario_id, last_run_at, rule_config, horizon,
+                priorities, risks, search_lc, _df) -> str:
+    """CSV export of the filtered impact table, reused until the scenario or filters change."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(_df.columns)
+    writer.writerows(zip(*(_df[c].tolist() for c in _df.columns)))
+    return buf.getvalue()
 
 
 def render(sidebar_state):
@@ -45,27 +148,29 @@ def render(sidebar_state):
         st.info("No allocation results available. Run a simulation from the Scenario Lab.")
         return
 
-    allocations = scenario.allocation_results
-    assignments = scenario.floor_assignments
     units = get_units()
-    unit_map = {u.unit_name: u for u in units}
+    unit_buildings, floors_by_unit = _unit_placements(
+        get_data_version(), scenario.scenario_id, scenario.last_run_at, scenario.floor_assignments,
+    )
 
-    # Pre-compute building spread per unit
-    unit_buildings = defaultdict(set)
-    for a in assignments:
-        unit_buildings[a.unit_name].add(a.building_id)
+    _impact_table(scenario, units, unit_buildings)
+    _unit_detail(scenario.allocation_results, floors_by_unit)
 
-    # Compute RTO alerts (use scenario-modified attendance for RTO mandate)
-    attendance_profiles = get_attendance()
-    att_map = {a.unit_name: a for a in attendance_profiles}
-    _, scenario_att_map = apply_overrides(units, att_map, scenario)
-    rto_alerts = compute_rto_alerts(allocations, units, scenario_att_map, get_rule_config())
-    rto_status_map = {ra["unit_name"]: ra for ra in rto_alerts}
+
+@st.fragment
+def _impact_table(scenario, units, unit_buildings):
+    """Filters, impact table and CSV export; runs as a fragment so filter edits rerun only this."""
+    allocations = scenario.allocation_results
+    unit_map = get_unit_index()
+
+    # RTO alerts per unit (scenario-modified attendance), shared across tabs per scenario run
+    rule_config = get_rule_config()
+    _, _, rto_alert_map = get_scenario_rto(scenario)
 
     # --- Filters ---
     col_f1, col_f2, col_f3 = st.columns(3)
     with col_f1:
-        priorities = sorted(set(u.business_priority or "None" for u in units))
+        priorities = _priority_options(get_data_version(), units)
         selected_priorities = st.multiselect("Filter by Priority", priorities, default=priorities)
     with col_f2:
         risk_filter = st.multiselect("Filter by Risk", ["RED", "AMBER", "GREEN"],
@@ -74,60 +179,57 @@ def render(sidebar_state):
         search = st.text_input("Search Unit Name", "")
 
     # --- Build table ---
-    rows = []
-    for a in allocations:
-        u = unit_map.get(a.unit_name)
-        if not u:
-            continue
-
-        priority = u.business_priority or "None"
-        if priority not in selected_priorities:
-            continue
-
-        gap_pct = a.seat_gap / a.effective_demand_seats if a.effective_demand_seats > 0 else 0
-        risk = _compute_risk_level(gap_pct, a.fragmentation_score)
-
-        if risk not in risk_filter:
-            continue
-
-        if search and search.lower() not in a.unit_name.lower():
-            continue
-
-        projected_hc = round(u.projected_hc(scenario.planning_horizon_months))
-
-        rto_info = rto_status_map.get(a.unit_name)
-        rto_status = rto_info["status"] if rto_info else "N/A"
-
-        bldg_count = len(unit_buildings.get(a.unit_name, set()))
-        rows.append({
-            "Unit": a.unit_name,
-            "Priority": priority,
-            "Current HC": u.current_total_hc,
-            "Projected HC": projected_hc,
-            "Growth %": f"{u.hc_growth_pct:.1%}",
-            "Attrition %": f"{u.attrition_pct:.1%}",
-            "Alloc %": f"{a.recommended_alloc_pct:.1%}",
-            "Overridden": "Yes" if a.is_overridden else "",
-            "Demand (seats)": a.effective_demand_seats,
-            "Allocated": a.allocated_seats,
-            "Gap": a.seat_gap,
-            "Gap %": f"{gap_pct:.1%}",
-            "Fragmentation": f"{a.fragmentation_score:.2f}",
-            "Buildings": bldg_count,
-            "Risk Level": risk,
-            "RTO Status": rto_status,
-        })
-
-    if not rows:
+    # The per-unit frame is built once per scenario run; filters are masks over it
+    # and only the surviving rows are formatted.
+    run_key = (
+        get_data_version(), scenario.scenario_id, scenario.last_run_at, rule_config,
+        scenario.planning_horizon_months,
+    )
+    frame = _impact_frame(*run_key, allocations, unit_map, unit_buildings, rto_alert_map)
+    filter_key = (tuple(sorted(selected_priorities)), tuple(sorted(risk_filter)), search.lower())
+    view = frame.iloc[_filtered_rows(*run_key, *filter_key, frame)]
+    if view.empty:
         st.info("No units match the current filters.")
         return
 
-    df = pd.DataFrame(rows)
-    render_risk_table(df)
+    df = pd.DataFrame({
+        "Unit": view.index.to_numpy(),
+        "Priority": view["priority"].to_numpy(),
+        "Current HC": view["current_hc"].to_numpy(),
+        "Projected HC": view["projected_hc"].to_numpy(),
+        "Growth %": _fmt_pct(view["hc_growth_pct"].to_numpy()),
+        "Attrition %": _fmt_pct(view["attrition_pct"].to_numpy()),
+        "Alloc %": _fmt_pct(view["alloc_pct"].to_numpy()),
+        "Overridden": np.where(view["overridden"].to_numpy(), "Yes", ""),
+        "Demand (seats)": view["demand"].to_numpy(),
+        "Allocated": view["allocated"].to_numpy(),
+        "Gap": view["gap"].to_numpy(),
+        "Gap %": _fmt_pct(view["gap_pct"].to_numpy()),
+        "Fragmentation": np.char.mod("%.2f", view["fragmentation"].to_numpy()),
+        "Buildings": view["buildings"].to_numpy(),
+        "Risk Level": view["risk"].to_numpy(),
+        "RTO Status": view["rto_status"].to_numpy(),
+    }, copy=False)
+    n_pages = -(-len(df) // UNIT_IMPACT_PAGE_SIZE)
+    if n_pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+        start = (page - 1) * UNIT_IMPACT_PAGE_SIZE
+        stop = min(start + UNIT_IMPACT_PAGE_SIZE, len(df))
+        st.caption(f"Showing units {start + 1}–{stop} of {len(df)}.")
+        render_risk_table(df.iloc[start:stop])
+    else:
+        render_risk_table(df)
 
     # --- Export ---
-    csv = df.to_csv(index=False)
-    st.download_button("Export Unit Impact (CSV)", csv, "unit_impact.csv", "text/csv")
+    csv_data = _impact_csv(*run_key, *filter_key, df)
+    st.download_button("Export Unit Impact (CSV)", csv_data, "unit_impact.csv", "text/csv")
+
+
+@st.fragment
+def _unit_detail(allocations, floors_by_unit):
+    """Per-unit explanation and floor assignments; a fragment so picking a unit skips the table."""
+    all_unit_names = tuple(a.unit_name for a in allocations)
+    alloc_by_name = dict(zip(all_unit_names, allocations))
 
     # --- Unit Detail Expander ---
     st.divider()
@@ -135,25 +237,31 @@ def render(sidebar_state):
 
     selected_unit = st.selectbox(
         "Select a unit for detailed view",
-        [a.unit_name for a in allocations],
+        all_unit_names,
         key="unit_detail_select",
     )
 
     if selected_unit:
-        alloc = next((a for a in allocations if a.unit_name == selected_unit), None)
+        alloc = alloc_by_name.get(selected_unit)
         if alloc:
             st.markdown("**Allocation Explanation:**")
             for step in alloc.explanation_steps:
                 st.markdown(f"- {step}")
 
             # Floor assignments for this unit
-            unit_floors = [a for a in assignments if a.unit_name == selected_unit]
+            unit_floors = floors_by_unit.get(selected_unit, [])
             if unit_floors:
                 # Spatial summary
-                bldgs = sorted(set(a.building_id for a in unit_floors))
-                towers = sorted(set(a.tower_id for a in unit_floors))
-                floor_count = len(set((a.tower_id, a.floor_number) for a in unit_floors))
-                total_seats = sum(a.seats_assigned for a in unit_floors)
+                bldgs, towers, floor_keys = set(), set(), set()
+                total_seats = 0
+                for a in unit_floors:
+                    bldgs.add(a.building_id)
+                    towers.add(a.tower_id)
+                    floor_keys.add((a.tower_id, a.floor_number))
+                    total_seats += a.seats_assigned
+                bldgs = sorted(bldgs)
+                towers = sorted(towers)
+                floor_count = len(floor_keys)
 
                 summary = (
                     f"**{selected_unit}**: {total_seats} seats across "
@@ -172,11 +280,13 @@ def render(sidebar_state):
                     )
 
                 st.markdown("**Floor Assignments:**")
-                floor_data = [{
-                    "Building": a.building_id,
-                    "Tower": a.tower_id,
-                    "Floor": a.floor_number,
-                    "Seats": a.seats_assigned,
-                    "Adjacency": ADJACENCY_LABELS.get(a.adjacency_tier, a.adjacency_tier),
-                } for a in unit_floors]
-                st.dataframe(pd.DataFrame(floor_data), use_container_width=True)
+                floor_df = pd.DataFrame({
+                    "Building": [a.building_id for a in unit_floors],
+                    "Tower": [a.tower_id for a in unit_floors],
+                    "Floor": [a.floor_number for a in unit_floors],
+                    "Seats": [a.seats_assigned for a in unit_floors],
+                    "Adjacency": [
+                        ADJACENCY_LABELS.get(a.adjacency_tier, a.adjacency_tier) for a in unit_floors
+                    ],
+                })
+                st.dataframe(floor_df, use_container_width=True)
@@ -2,6 +2,7 @@
 
 import sys
 import os
+import pytest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from models.building import Floor
@@ -130,6 +131,51 @@ class TestOptimizer:
         assert a_seats + b_seats <= 200  # respects total capacity
         assert abs(a_seats - b_seats) <= 10  # roughly fair
 
+    def test_floors_used_counts_distinct_floors(self):
+        """floors_used should match the distinct floors in the assignments."""
+        floors = [make_floor(floor_num=i, seats=50) for i in range(1, 5)]
+        allocs = [make_alloc(name="A", demand=80), make_alloc(name="B", demand=40)]
+
+        result = optimize_allocation(allocs, floors, [], objective="optimal_placement")
+        assert "Optimal" in result.status
+        distinct = {(a.tower_id, a.floor_number) for a in result.assignments}
+        assert result.floors_used == len(distinct)
+        assert result.floors_used >= 3  # 120 seats need at least 3 floors of 50
+
+    def test_before_after_df_is_columnar(self):
+        """Before/after comparison comes back as a DataFrame with derived change columns."""
+        floors = [make_floor(floor_num=i, seats=200) for i in range(1, 4)]
+        allocs = [make_alloc(name="A", demand=80), make_alloc(name="B", demand=60)]
+        baseline = [
+            FloorAssignment("A", "B1", "B1-T1", 1, 40, "same_floor"),
+            FloorAssignment("A", "B1", "B1-T1", 2, 40, "adjacent_floor"),
+        ]
+
+        result = optimize_allocation(allocs, floors, baseline, objective="optimal_placement")
+        df = result.before_after_df
+        assert list(df["Unit"]) == ["A", "B"]
+        assert (df["Seat Change"] == df["After Seats"] - df["Before Seats"]).all()
+        assert (df["Floor Change"] == df["After Floors"] - df["Before Floors"]).all()
+        assert df.loc[df["Unit"] == "B", "Before Seats"].item() == 0
+
+    def test_cbc_and_highs_agree(self):
+        """Both solver backends should reach the same optimal allocation."""
+        floors = [make_floor(floor_num=i, seats=200) for i in range(1, 4)]
+        allocs = [make_alloc(name="A", demand=100), make_alloc(name="B", demand=80)]
+
+        cbc = optimize_allocation(allocs, floors, [], solver_method="cbc")
+        highs = optimize_allocation(allocs, floors, [], solver_method="highs")
+        assert "Optimal" in cbc.status and "Optimal" in highs.status
+        assert cbc.unit_allocations == highs.unit_allocations
+
+    def test_unknown_solver_method_raises(self):
+        """A misspelled backend should fail loudly rather than silently pick a solver."""
+        floors = [make_floor(seats=200)]
+        allocs = [make_alloc(name="A", demand=100)]
+
+        with pytest.raises(ValueError, match="higs"):
+            optimize_allocation(allocs, floors, [], solver_method="higs")
+
 
 if __name__ == "__main__":
     import pytest
@@ -81,6 +81,15 @@ class TestRunScenario:
         total_alloc = sum(a.allocated_seats for a in result.allocation_results)
         assert total_alloc > 0
 
+    def test_run_clears_stale_flag(self):
+        units = [make_unit(name="A", hc=100)]
+        att_map = {"A": make_attendance(name="A", median=70, max_hc=85)}
+        floors = [make_floor(floor_num=1, seats=100)]
+        scenario = Scenario("test", "Test", "", "custom", is_stale=True)
+
+        result = run_scenario(scenario, units, att_map, floors)
+        assert result.is_stale is False
+
 
 if __name__ == "__main__":
     import pytest
@@ -0,0 +1,44 @@
+"""Tests for session store scenario staleness."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from datetime import datetime
+
+import pytest
+import streamlit as st
+
+from models.scenario import Scenario
+from data.session_store import (
+    initialize_session_state, add_scenario, get_scenarios, set_last_data_edit,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    st.session_state.clear()
+    initialize_session_state()
+    yield
+    st.session_state.clear()
+
+
+class TestScenarioStaleness:
+    def test_data_edit_marks_existing_scenarios_stale(self):
+        add_scenario(Scenario("s1", "S1", "", "custom"))
+        set_last_data_edit()
+        assert get_scenarios()["s1"].is_stale is True
+
+    def test_scenario_added_after_edit_is_stale(self):
+        set_last_data_edit()
+        add_scenario(Scenario("s2", "S2", "", "custom"))
+        assert get_scenarios()["s2"].is_stale is True
+
+    def test_scenario_run_after_edit_is_not_stale(self):
+        set_last_data_edit()
+        add_scenario(Scenario("s3", "S3", "", "custom", last_run_at=datetime.now()))
+        assert get_scenarios()["s3"].is_stale is False
+
+    def test_no_data_edit_means_not_stale(self):
+        add_scenario(Scenario("s4", "S4", "", "custom"))
+        assert get_scenarios()["s4"].is_stale is False
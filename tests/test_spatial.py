@@ -77,6 +77,17 @@ class TestFloorUtilization:
         assert util[0]["available_seats"] == 40
         assert abs(util[0]["utilization_pct"] - 0.6) < 0.01
 
+    def test_units_str(self):
+        floors = [make_floor(floor_num=1), make_floor(floor_num=2)]
+        assignments = [
+            FloorAssignment("Eng", "B1", "B1-T1", 1, 60, "same_floor"),
+            FloorAssignment("Ops", "B1", "B1-T1", 1, 20, "same_floor"),
+        ]
+
+        util = get_floor_utilization(floors, assignments)
+        assert util[0]["units_str"] == "Eng: 60, Ops: 20"
+        assert util[1]["units_str"] == "—"
+
 
 class TestAdjacencyTier:
     def test_same_floor(self):